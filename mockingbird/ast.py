@@ -1,8 +1,53 @@
-from dataclasses import dataclass
+import sys
+import threading
+from array import array
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from weakref import WeakValueDictionary
 
-@dataclass(frozen=True, slots=True)
+@dataclass(frozen=True, slots=True, init=False, repr=False, eq=False, weakref_slot=True)
 class Var:
   index: int
+  size: int = field(init=False, repr=False)
+  depth: int = field(init=False, repr=False)
+  max_free: int = field(init=False, repr=False)
+  _hash: int = field(init=False, repr=False)
+
+  def __new__(cls, index: int) -> Var:
+    node = _vars.get(index)
+    if node is None:
+      node = object.__new__(cls)
+      object.__setattr__(node, 'index', index)
+      object.__setattr__(node, 'size', 1)
+      object.__setattr__(node, 'depth', 1)
+      object.__setattr__(node, 'max_free', index)
+      object.__setattr__(node, '_hash', (index * _VAR_MUL + _VAR_ADD) % _HASH_MOD)
+      with _lock:
+        node = _vars.setdefault(index, node)
+      ##
+    ##
+    return node
+  ##
+
+  def __hash__(self) -> int:
+    return self._hash
+  ##
+
+  def __reduce__(self) -> tuple[type[Var], tuple[int]]:
+    return (Var, (self.index,))
+  ##
+
+  def __copy__(self) -> Var:
+    return self
+  ##
+
+  def __deepcopy__(self, memo: dict[int, object]) -> Var:
+    return self
+  ##
+
+  def __repr__(self) -> str:
+    return f"Var(index={self.index})"
+  ##
 
   def __str__(self) -> str:
     return str(self.index)
@@ -31,91 +76,405 @@ class Var:
   ##
 ##
 
-@dataclass(frozen=True, slots=True)
+@dataclass(frozen=True, slots=True, init=False, repr=False, eq=False, weakref_slot=True)
 class Func:
   body: Expr
+  size: int = field(init=False, repr=False)
+  depth: int = field(init=False, repr=False)
+  max_free: int = field(init=False, repr=False)
+  _hash: int = field(init=False, repr=False)
+
+  def __new__(cls, body: Expr) -> Func:
+    node = _funcs.get(body)
+    if node is None:
+      node = object.__new__(cls)
+      object.__setattr__(node, 'body', body)
+      object.__setattr__(node, 'size', body.size + 1)
+      object.__setattr__(node, 'depth', body.depth + 1)
+      object.__setattr__(node, 'max_free', max(body.max_free - 1, -1))
+      object.__setattr__(node, '_hash', (body._hash * _FUNC_MUL + _FUNC_ADD) % _HASH_MOD)
+      with _lock:
+        node = _funcs.setdefault(body, node)
+      ##
+    ##
+    return node
+  ##
+
+  def __hash__(self) -> int:
+    return self._hash
+  ##
+
+  def __reduce__(self) -> tuple[Callable[[bytes], Expr], tuple[bytes]]:
+    return (_unflatten, (_flatten(self),))
+  ##
+
+  def __copy__(self) -> Func:
+    return self
+  ##
+
+  def __deepcopy__(self, memo: dict[int, object]) -> Func:
+    return self
+  ##
+
+  def __repr__(self) -> str:
+    return _repr(self)
+  ##
 
   def __str__(self) -> str:
-    return f"λ {self.body}"
+    return _str(self)
   ##
 
   def shift(self, d: int, cutoff: int = 0) -> Expr:
-    return Func(self.body.shift(d, cutoff + 1))
+    return _rewrite(self, cutoff, d, None)
   ##
 
   def substitute(self, index: int, replacement: Expr) -> Expr:
-    return Func(self.body.substitute(index + 1, replacement.shift(1)))
+    return _rewrite(self, index, 0, replacement)
   ##
 
   def is_free(self, index: int) -> bool:
-    return self.body.is_free(index + 1)
+    return _is_free(self, index)
   ##
 
   def beta_step(self) -> Expr | None:
-    result = self.body.beta_step()
-    if result is not None: return Func(result)
-    return None
+    return _find_step(self, _beta_redex)
   ##
 
   def eta_step(self) -> Expr | None:
-    if isinstance(self.body, Appl) and self.body.arg == Var(0) and not self.body.func.is_free(0):
-      return self.body.func.shift(-1)
-    ##
-    result = self.body.eta_step()
-    if result is not None: return Func(result)
-    return None
+    return _find_step(self, _eta_redex)
   ##
 ##
 
-@dataclass(frozen=True, slots=True)
+@dataclass(frozen=True, slots=True, init=False, repr=False, eq=False, weakref_slot=True)
 class Appl:
   func: Expr
   arg: Expr
+  size: int = field(init=False, repr=False)
+  depth: int = field(init=False, repr=False)
+  max_free: int = field(init=False, repr=False)
+  _hash: int = field(init=False, repr=False)
+
+  def __new__(cls, func: Expr, arg: Expr) -> Appl:
+    key = (func, arg)
+    node = _appls.get(key)
+    if node is None:
+      node = object.__new__(cls)
+      object.__setattr__(node, 'func', func)
+      object.__setattr__(node, 'arg', arg)
+      object.__setattr__(node, 'size', func.size + arg.size + 1)
+      object.__setattr__(node, 'depth', max(func.depth, arg.depth) + 1)
+      object.__setattr__(node, 'max_free', max(func.max_free, arg.max_free))
+      object.__setattr__(node, '_hash', _appl_hash(func._hash, arg._hash))
+      with _lock:
+        node = _appls.setdefault(key, node)
+      ##
+    ##
+    return node
+  ##
+
+  def __hash__(self) -> int:
+    return self._hash
+  ##
+
+  def __reduce__(self) -> tuple[Callable[[bytes], Expr], tuple[bytes]]:
+    return (_unflatten, (_flatten(self),))
+  ##
+
+  def __copy__(self) -> Appl:
+    return self
+  ##
+
+  def __deepcopy__(self, memo: dict[int, object]) -> Appl:
+    return self
+  ##
+
+  def __repr__(self) -> str:
+    return _repr(self)
+  ##
 
   def __str__(self) -> str:
-    left = f"({self.func})" if isinstance(self.func, Func) else self.func
-    right = f"({self.arg})" if isinstance(self.arg, (Func, Appl)) else self.arg
-    return f"{left} {right}"
+    return _str(self)
   ##
 
   def shift(self, d: int, cutoff: int = 0) -> Expr:
-    return Appl(self.func.shift(d, cutoff), self.arg.shift(d, cutoff))
+    return _rewrite(self, cutoff, d, None)
   ##
 
   def substitute(self, index: int, replacement: Expr) -> Expr:
-    return Appl(self.func.substitute(index, replacement), self.arg.substitute(index, replacement))
+    return _rewrite(self, index, 0, replacement)
   ##
 
   def is_free(self, index: int) -> bool:
-    return self.func.is_free(index) or self.arg.is_free(index)
+    return _is_free(self, index)
   ##
 
   def beta_step(self) -> Expr | None:
-    if isinstance(self.func, Func):
-      return _beta_reduce(self.func.body, self.arg)
-    ##
-    result = self.func.beta_step()
-    if result is not None: return Appl(result, self.arg)
-    result = self.arg.beta_step()
-    if result is not None: return Appl(self.func, result)
-    return None
+    return _find_step(self, _beta_redex)
   ##
 
   def eta_step(self) -> Expr | None:
-    result = self.func.eta_step()
-    if result is not None: return Appl(result, self.arg)
-    result = self.arg.eta_step()
-    if result is not None: return Appl(self.func, result)
-    return None
+    return _find_step(self, _eta_redex)
   ##
 ##
 
 type Expr = Var | Func | Appl
 
-def _beta_reduce(body: Expr, arg: Expr) -> Expr:
-  return body.substitute(0, arg.shift(1)).shift(-1)
+_HASH_MOD = (1 << 61) - 1
+_VAR_MUL = 0x2545F4914F6CDD1D % _HASH_MOD
+_VAR_ADD = 0x9E3779B97F4A7C15 % _HASH_MOD
+_FUNC_MUL = 0xBF58476D1CE4E5B9 % _HASH_MOD
+_FUNC_ADD = 0x94D049BB133111EB % _HASH_MOD
+_APPL_FUNC_MUL = 0xD6E8FEB86659FD93 % _HASH_MOD
+_APPL_ARG_MUL = 0xA0761D6478BD642F % _HASH_MOD
+_APPL_ADD = 0xE7037ED1A0B428DB % _HASH_MOD
+_APPL_MUL = 0x8EBC6AF09C88C6E3 % _HASH_MOD
+
+def _appl_hash(func: int, arg: int) -> int:
+  return (func * (arg * _APPL_MUL + _APPL_FUNC_MUL) + arg * _APPL_ARG_MUL + _APPL_ADD) % _HASH_MOD
+##
+
+type HashContext = tuple[int, int]
+
+def hash_context(outer: HashContext, node: Expr | None, side: int) -> HashContext:
+  if node is None:
+    mul, add = _FUNC_MUL, _FUNC_ADD
+  else:
+    add = _appl_hash(node._hash, 0) if side else _appl_hash(0, node._hash)
+    mul = ((_appl_hash(node._hash, 1) if side else _appl_hash(1, node._hash)) - add) % _HASH_MOD
+  ##
+  return (outer[0] * mul % _HASH_MOD, (outer[0] * add + outer[1]) % _HASH_MOD)
+##
+
+def plug_hash(context: HashContext, expr: Expr) -> int:
+  return (context[0] * expr._hash + context[1]) % _HASH_MOD
+##
+
+_vars: WeakValueDictionary[int, Var] = WeakValueDictionary()
+_funcs: WeakValueDictionary[Expr, Func] = WeakValueDictionary()
+_appls: WeakValueDictionary[tuple[Expr, Expr], Appl] = WeakValueDictionary()
+_lock = threading.Lock()
+
+def interned() -> int:
+  return len(_vars) + len(_funcs) + len(_appls)
+##
+
+def _flatten(expr: Expr) -> bytes:
+  ids: dict[Expr, int] = {}
+  codes = array('q')
+  todo: list[tuple[Expr, bool]] = [(expr, False)]
+  while todo:
+    node, ready = todo.pop()
+    if isinstance(node, Var) or node in ids: continue
+    if not ready:
+      todo.append((node, True))
+      if isinstance(node, Func):
+        todo.append((node.body, False))
+      else:
+        todo.append((node.arg, False))
+        todo.append((node.func, False))
+      ##
+      continue
+    ##
+    if isinstance(node, Func):
+      body = node.body
+      codes.extend((0, ~body.index if isinstance(body, Var) else ids[body]))
+    else:
+      func, arg = node.func, node.arg
+      codes.extend((
+        1, ~func.index if isinstance(func, Var) else ids[func], ~arg.index if isinstance(arg, Var) else ids[arg],
+      ))
+    ##
+    ids[node] = len(ids)
+  ##
+  if sys.byteorder == 'big': codes.byteswap()
+  return codes.tobytes()
+##
+
+def _unflatten(data: bytes) -> Expr:
+  codes = array('q')
+  codes.frombytes(data)
+  if sys.byteorder == 'big': codes.byteswap()
+  nodes: list[Expr] = []
+  i = 0
+  while i < len(codes):
+    if codes[i] == 0:
+      body = codes[i + 1]
+      nodes.append(Func(nodes[body] if body >= 0 else Var(~body)))
+      i += 2
+    else:
+      func, arg = codes[i + 1], codes[i + 2]
+      nodes.append(Appl(nodes[func] if func >= 0 else Var(~func), nodes[arg] if arg >= 0 else Var(~arg)))
+      i += 3
+    ##
+  ##
+  return nodes[-1]
+##
+
+def _rewrite(expr: Expr, base: int, d: int, replacement: Expr | None) -> Expr:
+  if replacement is None and d == 0: return expr
+  shifted: dict[int, Expr] = {}
+  done: dict[tuple[Expr, int], Expr] = {}
+  todo: list[tuple[Expr, int]] = [(expr, base)]
+  out: list[Expr] = []
+  while todo:
+    node, depth = todo.pop()
+    if depth < 0:
+      depth = ~depth
+      if isinstance(node, Func):
+        result = Func(out.pop())
+      else:
+        arg = out.pop()
+        result = Appl(out.pop(), arg)
+      ##
+      done[node, depth] = result
+      out.append(result)
+    elif node.max_free < depth:
+      out.append(node)
+    elif isinstance(node, Var):
+      if replacement is not None and node.index == depth:
+        result = shifted.get(depth)
+        if result is None:
+          result = shifted[depth] = replacement.shift(depth - base)
+        ##
+        out.append(result)
+      else:
+        out.append(Var(node.index + d))
+      ##
+    elif (result := done.get((node, depth))) is not None:
+      out.append(result)
+    else:
+      todo.append((node, ~depth))
+      if isinstance(node, Func):
+        todo.append((node.body, depth + 1))
+      else:
+        todo.append((node.arg, depth))
+        todo.append((node.func, depth))
+      ##
+    ##
+  ##
+  return out[0]
+##
+
+def _is_free(expr: Expr, index: int) -> bool:
+  seen: set[tuple[Expr, int]] = set()
+  todo: list[tuple[Expr, int]] = [(expr, index)]
+  while todo:
+    node, index = todo.pop()
+    if index > node.max_free or (node, index) in seen: continue
+    if index == node.max_free: return True
+    seen.add((node, index))
+    if isinstance(node, Func):
+      todo.append((node.body, index + 1))
+    elif isinstance(node, Appl):
+      todo.append((node.arg, index))
+      todo.append((node.func, index))
+    ##
+  ##
+  return False
+##
+
+type _Path = tuple[Func | Appl, int, _Path] | None
+
+def _plug_path(result: Expr, path: _Path) -> Expr:
+  while path is not None:
+    parent, side, path = path
+    if isinstance(parent, Func): result = Func(result)
+    elif side: result = Appl(parent.func, result)
+    else: result = Appl(result, parent.arg)
+  ##
+  return result
+##
+
+def _find_step(
+    expr: Expr, contract: Callable[[Expr], Expr | None],
+    fallback: Callable[[Expr], Expr | None] | None = None,
+) -> Expr | None:
+  seen: set[Expr] = set()
+  todo: list[tuple[Expr, _Path]] = [(expr, None)]
+  found: tuple[Expr, _Path] | None = None
+  while todo:
+    node, path = todo.pop()
+    if node in seen: continue
+    seen.add(node)
+    result = contract(node)
+    if result is not None: return _plug_path(result, path)
+    if fallback is not None and found is None and (result := fallback(node)) is not None:
+      found = (result, path)
+    ##
+    if isinstance(node, Func):
+      todo.append((node.body, (node, 0, path)))
+    elif isinstance(node, Appl):
+      todo.append((node.arg, (node, 1, path)))
+      todo.append((node.func, (node, 0, path)))
+    ##
+  ##
+  return None if found is None else _plug_path(*found)
+##
+
+def _beta_redex(expr: Expr) -> Expr | None:
+  if isinstance(expr, Appl) and isinstance(expr.func, Func):
+    return beta_reduce(expr.func.body, expr.arg)
+  ##
+  return None
+##
+
+def _eta_redex(expr: Expr) -> Expr | None:
+  if isinstance(expr, Func):
+    body = expr.body
+    if isinstance(body, Appl) and body.arg is Var(0) and not body.func.is_free(0):
+      return body.func.shift(-1)
+    ##
+  ##
+  return None
+##
+
+def eta_func(body: Expr) -> Expr:
+  if isinstance(body, Appl) and body.arg is Var(0) and not body.func.is_free(0):
+    return body.func.shift(-1)
+  ##
+  return Func(body)
+##
+
+def _str(expr: Expr) -> str:
+  parts: list[str] = []
+  todo: list[Expr | str] = [expr]
+  while todo:
+    item = todo.pop()
+    if isinstance(item, str):
+      parts.append(item)
+    elif isinstance(item, Var):
+      parts.append(str(item.index))
+    elif isinstance(item, Func):
+      todo.append(item.body)
+      todo.append("λ ")
+    else:
+      if isinstance(item.arg, Var): todo.append(item.arg)
+      else: todo.extend((")", item.arg, "("))
+      todo.append(" ")
+      if isinstance(item.func, Func): todo.extend((")", item.func, "("))
+      else: todo.append(item.func)
+    ##
+  ##
+  return "".join(parts)
+##
+
+def _repr(expr: Expr) -> str:
+  parts: list[str] = []
+  todo: list[Expr | str] = [expr]
+  while todo:
+    item = todo.pop()
+    if isinstance(item, str): parts.append(item)
+    elif isinstance(item, Var): parts.append(repr(item))
+    elif isinstance(item, Func): todo.extend((")", item.body, "Func(body="))
+    else: todo.extend((")", item.arg, ", arg=", item.func, "Appl(func="))
+  ##
+  return "".join(parts)
+##
+
+def beta_reduce(body: Expr, arg: Expr) -> Expr:
+  return _rewrite(body, 0, -1, arg)
 ##
 
 def step(expr: Expr) -> Expr | None:
-  return expr.beta_step() or expr.eta_step()
+  return _find_step(expr, _beta_redex, _eta_redex)
 ##
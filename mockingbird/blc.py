@@ -0,0 +1,154 @@
+import struct
+from collections.abc import Iterable, Iterator
+from typing import BinaryIO
+from mockingbird.ast import Appl, Expr, Func, Var
+
+_MAGIC = b'MBLC'
+_HEADER = struct.Struct('<4sB')
+_SHARED = 1
+
+_FUNC = -1
+_APPL = -2
+
+def _gamma(n: int) -> str:
+  bits = format(n, 'b')
+  return '0' * (len(bits) - 1) + bits
+##
+
+def _read_gamma(bits: str, pos: int) -> tuple[int, int]:
+  one = bits.find('1', pos)
+  if one < 0: raise ValueError("truncated term")
+  end = 2 * one - pos + 1
+  if end > len(bits): raise ValueError("truncated term")
+  return int(bits[one:end], 2), end
+##
+
+def _encode(expr: Expr, shared: bool) -> str:
+  parts: list[str] = []
+  ids: dict[Expr, int] = {}
+  todo: list[tuple[Expr, bool]] = [(expr, False)]
+  while todo:
+    node, done = todo.pop()
+    if done:
+      ids[node] = len(ids)
+    elif isinstance(node, Var):
+      parts.append('1' * (node.index + 1 + shared) + '0')
+    elif shared and (known := ids.get(node)) is not None:
+      parts.append('10' + _gamma(len(ids) - known))
+    else:
+      if shared: todo.append((node, True))
+      if isinstance(node, Func):
+        parts.append('00')
+        todo.append((node.body, False))
+      else:
+        parts.append('01')
+        todo.append((node.arg, False))
+        todo.append((node.func, False))
+      ##
+    ##
+  ##
+  return ''.join(parts)
+##
+
+def _decode(bits: str, shared: bool) -> tuple[Expr, int]:
+  pos = 0
+  table: list[Expr] = []
+  stack: list[Expr | int] = []
+  while True:
+    code = bits[pos:pos + 2]
+    if code == '00':
+      stack.append(_FUNC)
+      pos += 2
+      continue
+    ##
+    if code == '01':
+      stack.append(_APPL)
+      pos += 2
+      continue
+    ##
+    if len(code) < 2: raise ValueError("truncated term")
+    if shared and code == '10':
+      n, pos = _read_gamma(bits, pos + 2)
+      if n > len(table): raise ValueError("back-reference out of range")
+      value = table[-n]
+    else:
+      end = bits.find('0', pos)
+      if end < 0: raise ValueError("truncated term")
+      value = Var(end - pos - 1 - shared)
+      pos = end + 1
+    ##
+    while stack:
+      top = stack.pop()
+      if top == _APPL:
+        stack.append(value)
+        break
+      ##
+      value = Func(value) if top == _FUNC else Appl(top, value)
+      if shared: table.append(value)
+    else:
+      return value, pos
+    ##
+  ##
+##
+
+def encode(expr: Expr, shared: bool = False) -> bytes:
+  bits = _encode(expr, shared)
+  size = (len(bits) + 7) // 8
+  return (int(bits, 2) << (8 * size - len(bits))).to_bytes(size)
+##
+
+def decode(data: bytes, shared: bool = False) -> Expr:
+  bits = format(int.from_bytes(data), f'0{8 * len(data)}b') if data else ''
+  expr, pos = _decode(bits, shared)
+  if len(bits) - pos >= 8 or '1' in bits[pos:]: raise ValueError("trailing data after term")
+  return expr
+##
+
+def _varint(n: int) -> bytes:
+  out = bytearray()
+  while n >= 0x80:
+    out.append(n & 0x7f | 0x80)
+    n >>= 7
+  ##
+  out.append(n)
+  return bytes(out)
+##
+
+def _read_varint(fp: BinaryIO) -> int | None:
+  n = shift = 0
+  while True:
+    byte = fp.read(1)
+    if not byte:
+      if shift: raise ValueError("truncated frame length")
+      return None
+    ##
+    n |= (byte[0] & 0x7f) << shift
+    if byte[0] < 0x80: return n
+    shift += 7
+  ##
+##
+
+def dump(exprs: Iterable[Expr], fp: BinaryIO, shared: bool = True) -> int:
+  fp.write(_HEADER.pack(_MAGIC, _SHARED if shared else 0))
+  count = 0
+  for expr in exprs:
+    data = encode(expr, shared)
+    fp.write(_varint(len(data)))
+    fp.write(data)
+    count += 1
+  ##
+  return count
+##
+
+def load(fp: BinaryIO) -> Iterator[Expr]:
+  header = fp.read(_HEADER.size)
+  if len(header) < _HEADER.size: raise ValueError("not a term file")
+  magic, flags = _HEADER.unpack(header)
+  if magic != _MAGIC: raise ValueError("not a term file")
+  shared = bool(flags & _SHARED)
+  while (size := _read_varint(fp)) is not None:
+    data = fp.read(size)
+    if len(data) < size: raise ValueError("truncated frame")
+    yield decode(data, shared)
+  ##
+##
@@ -0,0 +1,292 @@
+from collections.abc import Callable
+from mockingbird.ast import Appl, Expr, Func, Var
+from mockingbird.parser import parse
+
+TRUE = parse(r"λ λ 1")
+FALSE = parse(r"λ λ 0")
+SUCC = parse(r"λ λ λ 1 (2 1 0)")
+PRED = parse(r"λ λ λ 2 (λ λ 0 (1 3)) (λ 1) (λ 0)")
+ADD = parse(r"λ λ λ λ 3 1 (2 1 0)")
+MUL = parse(r"λ λ λ 2 (1 0)")
+EXP = parse(r"λ λ 0 1")
+ISZERO = parse(r"λ 0 (λ λ λ 0) (λ λ 1)")
+AND = parse(r"λ λ 1 0 1")
+OR = parse(r"λ λ 1 1 0")
+NOT = parse(r"λ 0 (λ λ 0) (λ λ 1)")
+
+def numeral(n: int) -> Expr:
+  body: Expr = Var(0)
+  for _ in range(n):
+    body = Appl(Var(1), body)
+  ##
+  return Func(Func(body))
+##
+
+def boolean(b: bool) -> Expr:
+  return TRUE if b else FALSE
+##
+
+def to_int(expr: Expr) -> int | None:
+  if expr is Func(Var(0)): return 1
+  if not (isinstance(expr, Func) and isinstance(expr.body, Func)): return None
+  body = expr.body.body
+  f = Var(1)
+  n = 0
+  while isinstance(body, Appl) and body.func is f:
+    body = body.arg
+    n += 1
+  ##
+  return n if body is Var(0) else None
+##
+
+def to_bool(expr: Expr) -> bool | None:
+  if expr is TRUE: return True
+  if expr is FALSE: return False
+  return None
+##
+
+def pair(first: Expr, second: Expr) -> Expr:
+  return Func(Appl(Appl(Var(0), first.shift(1)), second.shift(1)))
+##
+
+def _lowest_free(expr: Expr) -> int:
+  lowest = expr.max_free
+  seen: set[tuple[Expr, int]] = set()
+  todo: list[tuple[Expr, int]] = [(expr, 0)]
+  while todo:
+    node, depth = todo.pop()
+    if node.max_free < depth or (node, depth) in seen: continue
+    seen.add((node, depth))
+    if isinstance(node, Var):
+      lowest = min(lowest, node.index - depth)
+    elif isinstance(node, Func):
+      todo.append((node.body, depth + 1))
+    else:
+      todo.append((node.arg, depth))
+      todo.append((node.func, depth))
+    ##
+  ##
+  return lowest
+##
+
+def _unshift(expr: Expr, d: int) -> Expr | None:
+  if expr.max_free < 0: return expr
+  if _lowest_free(expr) < d: return None
+  return expr.shift(-d)
+##
+
+def to_pair(expr: Expr) -> tuple[Expr, Expr] | None:
+  if not isinstance(expr, Func): return None
+  body = expr.body
+  if not (isinstance(body, Appl) and isinstance(body.func, Appl) and body.func.func is Var(0)): return None
+  first, second = _unshift(body.func.arg, 1), _unshift(body.arg, 1)
+  if first is None or second is None: return None
+  return first, second
+##
+
+def church_list(items: list[Expr]) -> Expr:
+  body: Expr = Var(0)
+  for item in reversed(items):
+    body = Appl(Appl(Var(1), item.shift(2)), body)
+  ##
+  return Func(Func(body))
+##
+
+def to_list(expr: Expr) -> list[Expr] | None:
+  if isinstance(expr, Func) and isinstance(expr.body, Appl) and expr.body.func is Var(0):
+    item = _unshift(expr.body.arg, 1)
+    return None if item is None else [item]
+  ##
+  if not (isinstance(expr, Func) and isinstance(expr.body, Func)): return None
+  body = expr.body.body
+  c = Var(1)
+  items: list[Expr] = []
+  while isinstance(body, Appl) and isinstance(body.func, Appl) and body.func.func is c:
+    item = _unshift(body.func.arg, 2)
+    if item is None: return None
+    items.append(item)
+    body = body.arg
+  ##
+  return items if body is Var(0) else None
+##
+
+NIL = parse(r"λ λ 1")
+
+def scott_list(items: list[Expr]) -> Expr:
+  tail = NIL
+  for item in reversed(items):
+    tail = Func(Func(Appl(Appl(Var(0), item.shift(2)), tail.shift(2))))
+  ##
+  return tail
+##
+
+def to_scott_list(expr: Expr) -> list[Expr] | None:
+  items: list[Expr] = []
+  depth = 0
+  while expr is not NIL:
+    if not (isinstance(expr, Func) and isinstance(expr.body, Func)): return None
+    body = expr.body.body
+    if not (isinstance(body, Appl) and isinstance(body.func, Appl) and body.func.func is Var(0)): return None
+    item = _unshift(body.func.arg, depth + 2)
+    if item is None: return None
+    items.append(item)
+    expr = body.arg
+    depth += 2
+  ##
+  return items
+##
+
+type Shape = type[int] | type[bool] | tuple[Shape, Shape] | list[Shape]
+type Value = int | bool | tuple[Value, Value] | list[Value]
+
+def encode(value: Value, scott: bool = False) -> Expr:
+  out: list[Expr] = []
+  todo: list[tuple[Value, int]] = [(value, -1)]
+  while todo:
+    item, count = todo.pop()
+    if count >= 0:
+      items = out[len(out) - count:]
+      del out[len(out) - count:]
+      if isinstance(item, tuple): out.append(pair(*items))
+      elif scott: out.append(scott_list(items))
+      else: out.append(church_list(items))
+    elif isinstance(item, bool):
+      out.append(boolean(item))
+    elif isinstance(item, int):
+      out.append(numeral(item))
+    else:
+      todo.append((item, len(item)))
+      todo.extend((child, -1) for child in reversed(item))
+    ##
+  ##
+  return out[0]
+##
+
+def decode(expr: Expr, shape: Shape, scott: bool = False) -> Value:
+  out: list[Value] = []
+  todo: list[tuple[Expr | None, Shape, int]] = [(expr, shape, -1)]
+  while todo:
+    node, kind, count = todo.pop()
+    if node is None:
+      items = out[len(out) - count:]
+      del out[len(out) - count:]
+      out.append(tuple(items) if isinstance(kind, tuple) else items)
+    elif kind is bool:
+      if (b := to_bool(node)) is None: raise ValueError(f"not a boolean: {node}")
+      out.append(b)
+    elif kind is int:
+      if (n := to_int(node)) is None: raise ValueError(f"not a numeral: {node}")
+      out.append(n)
+    elif isinstance(kind, tuple):
+      if (parts := to_pair(node)) is None: raise ValueError(f"not a pair: {node}")
+      todo.append((None, kind, 2))
+      todo.append((parts[1], kind[1], -1))
+      todo.append((parts[0], kind[0], -1))
+    else:
+      items = to_scott_list(node) if scott else to_list(node)
+      if items is None: raise ValueError(f"not a list: {node}")
+      todo.append((None, kind, len(items)))
+      todo.extend((item, kind[0], -1) for item in reversed(items))
+    ##
+  ##
+  return out[0]
+##
+
+type _Value = tuple[int | None, bool | None]
+
+_MAX_NUMERAL = 1 << 15
+_MAX_BITS = 1 << 16
+
+def _bounded(bits: int, compute: Callable[[], int]) -> _Value | None:
+  return (compute(), None) if bits <= _MAX_BITS else None
+##
+
+_OPS: dict[Expr, tuple[int, bool, Callable[..., _Value]]] = {
+  SUCC: (1, False, lambda n: (n + 1, None)),
+  PRED: (1, False, lambda n: (max(n - 1, 0), None)),
+  ISZERO: (1, False, lambda n: (None, n == 0)),
+  ADD: (2, False, lambda m, n: _bounded(max(m.bit_length(), n.bit_length()) + 1, lambda: m + n)),
+  MUL: (2, False, lambda m, n: _bounded(m.bit_length() + n.bit_length(), lambda: m * n)),
+  EXP: (2, False, lambda m, n: _bounded(m.bit_length() * n if m > 1 else 1, lambda: m ** n)),
+  NOT: (1, True, lambda p: (None, not p)),
+  AND: (2, True, lambda p, q: (None, p and q)),
+  OR: (2, True, lambda p, q: (None, p or q)),
+}
+
+def _fold(expr: Appl, values: dict[Expr, _Value | None]) -> _Value | None:
+  candidates = [(expr.func, (expr.arg,))]
+  if isinstance(expr.func, Appl): candidates.append((expr.func.func, (expr.func.arg, expr.arg)))
+  for head, args in candidates:
+    op = _OPS.get(head)
+    if op is None or op[0] != len(args): continue
+    _, logical, apply = op
+    decoded = []
+    for arg in args:
+      value = values.get(arg)
+      item = None if value is None else value[1] if logical else value[0]
+      if item is None: return None
+      decoded.append(item)
+    ##
+    return apply(*decoded)
+  ##
+  return None
+##
+
+def _values(expr: Expr) -> dict[Expr, _Value | None]:
+  values: dict[Expr, _Value | None] = {}
+  todo: list[tuple[Expr, bool]] = [(expr, False)]
+  while todo:
+    node, ready = todo.pop()
+    if node in values: continue
+    if isinstance(node, Var):
+      values[node] = None
+    elif isinstance(node, Func):
+      n, b = to_int(node), to_bool(node)
+      if n is not None or b is not None:
+        values[node] = (n, b)
+      elif ready:
+        values[node] = None
+      else:
+        todo.append((node, True))
+        todo.append((node.body, False))
+      ##
+    elif ready:
+      values[node] = _fold(node, values)
+    else:
+      todo.append((node, True))
+      todo.append((node.arg, False))
+      todo.append((node.func, False))
+    ##
+  ##
+  return values
+##
+
+def accelerate(expr: Expr) -> Expr:
+  values = _values(expr)
+  done: dict[Expr, Expr] = {}
+  todo: list[tuple[Expr, bool]] = [(expr, False)]
+  while todo:
+    node, ready = todo.pop()
+    if node in done: continue
+    value = values[node]
+    if isinstance(node, Var) or (isinstance(node, Func) and value is not None):
+      done[node] = node
+    elif isinstance(node, Appl) and value is not None and (value[0] is None or value[0] <= _MAX_NUMERAL):
+      n, b = value
+      done[node] = numeral(n) if n is not None else boolean(bool(b))
+    elif not ready:
+      todo.append((node, True))
+      if isinstance(node, Func):
+        todo.append((node.body, False))
+      else:
+        todo.append((node.arg, False))
+        todo.append((node.func, False))
+      ##
+    elif isinstance(node, Func):
+      done[node] = Func(done[node.body])
+    else:
+      done[node] = Appl(done[node.func], done[node.arg])
+    ##
+  ##
+  return done[expr]
+##
@@ -0,0 +1,309 @@
+from dataclasses import dataclass
+from mockingbird.ast import Appl, Expr, Func, Var, eta_func
+
+_ROOT = 0
+_LAM = 1
+_APP = 2
+_FAN = 3
+_CROISSANT = 4
+_BRACKET = 5
+_ERA = 6
+_FREE = 7
+
+_ARITY = (0, 2, 2, 2, 1, 1, 0, 0)
+
+@dataclass(frozen=True, slots=True)
+class _Pair:
+  first: _Level
+  second: _Level
+##
+
+type _Level = tuple[int, _Level] | _Pair | None
+type _Context = tuple[_Level, ...]
+
+class _Net:
+
+  def __init__(self) -> None:
+    self.link: list[int] = []
+    self.kind: list[int] = []
+    self.level: list[int] = []
+    self.span: list[int] = []
+    self.free: list[int] = []
+  ##
+
+  def node(self, kind: int, level: int = 0, span: int = 1) -> int:
+    if self.free:
+      n = self.free.pop()
+      self.kind[n] = kind
+      self.level[n] = level
+      self.span[n] = span
+    else:
+      n = len(self.kind)
+      self.kind.append(kind)
+      self.level.append(level)
+      self.span.append(span)
+      self.link.extend((-1, -1, -1))
+    ##
+    return n
+  ##
+
+  def connect(self, p: int, q: int) -> None:
+    self.link[p] = q
+    self.link[q] = p
+  ##
+
+  def merge(self, n: int, side: int) -> None:
+    kind, level, span, link = self.kind, self.level, self.span, self.link
+    while True:
+      m, port = divmod(link[3 * n + 1 - side], 3)
+      if kind[m] != _CROISSANT or port != side: return
+      if side and level[m] - span[m] == level[n]:
+        level[n] = level[m]
+        self.connect(3 * n, link[3 * m])
+      elif not side and level[m] == level[n] - span[n]:
+        self.connect(3 * n + 1, link[3 * m + 1])
+      else:
+        return
+      ##
+      span[n] += span[m]
+      self.free.append(m)
+    ##
+  ##
+
+  def split(self, n: int) -> None:
+    level, span, link = self.level, self.span, self.link
+    port = 3 * n + 1
+    rest = link[port]
+    for box in range(level[n] - 1, level[n] - span[n], -1):
+      croissant = self.node(_CROISSANT, box)
+      self.connect(port, 3 * croissant)
+      port = 3 * croissant + 1
+    ##
+    self.connect(port, rest)
+    span[n] = 1
+  ##
+
+  def interacts(self, a: int, b: int) -> bool:
+    ka, kb = self.kind[a], self.kind[b]
+    if ka == _ROOT or kb == _ROOT: return False
+    if ka == _FREE: return _FAN <= kb <= _ERA
+    if kb == _FREE: return _FAN <= ka <= _ERA
+    return ka != kb or ka >= _FAN or self.level[a] == self.level[b]
+  ##
+
+  def rewrite(self, a: int, b: int) -> None:
+    kind, level, span, link = self.kind, self.level, self.span, self.link
+    if kind[b] in (_ERA, _FREE): a, b = b, a
+    if kind[a] in (_ERA, _FREE):
+      for p in [link[3 * b + i] for i in range(1, _ARITY[kind[b]] + 1)]:
+        if kind[a] == _FREE and kind[b] != _FAN:
+          self.connect(3 * a, p)
+          self.free.append(b)
+          return
+        ##
+        self.connect(3 * self.node(kind[a], level[a]), p)
+      ##
+    elif kind[a] == kind[b] == _CROISSANT and level[a] == level[b] and span[a] != span[b]:
+      if span[a] > span[b]: a, b = b, a
+      level[b] -= span[a]
+      span[b] -= span[a]
+      self.connect(3 * b, link[3 * a + 1])
+      self.free.append(a)
+      return
+    elif kind[a] == kind[b] and level[a] == level[b] or {kind[a], kind[b]} == {_LAM, _APP}:
+      if level[a] != level[b]: raise ValueError("malformed interaction net")
+      for i in range(1, _ARITY[kind[a]] + 1):
+        self.connect(link[3 * a + i], link[3 * b + i])
+      ##
+    else:
+      if kind[a] < _FAN or kind[b] >= _FAN and level[b] < level[a]: a, b = b, a
+      if kind[a] < _FAN or level[a] >= level[b]: raise ValueError("malformed interaction net")
+      if level[a] > level[b] - span[b]: self.split(b)
+      shift = level[b] + (-span[a] if kind[a] == _CROISSANT else 1 if kind[a] == _BRACKET else 0)
+      ka, kb = _ARITY[kind[a]], _ARITY[kind[b]]
+      bs = [self.node(kind[b], shift, span[b]) for _ in range(ka)]
+      as_ = [self.node(kind[a], level[a], span[a]) for _ in range(kb)]
+      ports = {3 * a + i + 1: 3 * bs[i] for i in range(ka)}
+      ports.update({3 * b + j + 1: 3 * as_[j] for j in range(kb)})
+      for old, new in ports.items():
+        other = link[old]
+        if other in ports:
+          if old < other: self.connect(new, ports[other])
+        else:
+          self.connect(new, other)
+        ##
+      ##
+      for i in range(ka):
+        for j in range(kb):
+          self.connect(3 * bs[i] + j + 1, 3 * as_[j] + i + 1)
+        ##
+      ##
+    ##
+    self.free.append(a)
+    self.free.append(b)
+  ##
+##
+
+def _build(expr: Expr, oracle: bool) -> _Net:
+  net = _Net()
+  labels = 0
+  net.node(_ROOT)
+  binders: list[tuple[int, int]] = []
+  uses: list[list[int]] = []
+  todo: list[tuple[Expr | None, int, int, int]] = [(expr, 0, 0, 0)]
+  while todo:
+    node, depth, level, parent = todo.pop()
+    if node is None:
+      lam, level = binders.pop()
+      ports = uses.pop()
+      var = 3 * lam + 1
+      if not ports:
+        net.connect(3 * net.node(_ERA), var)
+      ##
+      while len(ports) > 1:
+        if not oracle:
+          level = labels
+          labels += 1
+        ##
+        fan = net.node(_FAN, level)
+        net.connect(3 * fan, var)
+        net.connect(3 * fan + 1, ports.pop())
+        var = 3 * fan + 2
+      ##
+      if ports: net.connect(var, ports[0])
+    elif isinstance(node, Var):
+      if node.index < depth and not oracle:
+        uses[depth - 1 - node.index].append(parent)
+      elif node.index < depth:
+        binder = depth - 1 - node.index
+        port = 3 * net.node(_CROISSANT, level)
+        net.connect(port + 1, parent)
+        for box in range(level - 1, binders[binder][1] - 1, -1):
+          bracket = 3 * net.node(_BRACKET, box)
+          net.connect(bracket + 1, port)
+          port = bracket
+        ##
+        uses[binder].append(port)
+      else:
+        net.connect(3 * net.node(_FREE, depth - 1 - node.index), parent)
+      ##
+    elif isinstance(node, Func):
+      lam = net.node(_LAM, level if oracle else expr.size)
+      net.connect(3 * lam, parent)
+      binders.append((lam, level))
+      uses.append([])
+      todo.append((None, depth, level, 0))
+      todo.append((node.body, depth + 1, level, 3 * lam + 2))
+    else:
+      app = net.node(_APP, level if oracle else expr.size)
+      net.connect(3 * app + 2, parent)
+      todo.append((node.arg, depth, level + 1, 3 * app + 1))
+      todo.append((node.func, depth, level, 3 * app))
+    ##
+  ##
+  return net
+##
+
+def _cross(context: _Context, kind: int, level: int, span: int, side: int) -> tuple[_Context, int]:
+  levels = list(context)
+  if len(levels) <= level + 1:
+    levels.extend([None] * (level + 2 - len(levels)))
+  ##
+  if kind == _FAN:
+    if side:
+      levels[level] = (side, levels[level])
+    else:
+      top = levels[level]
+      if not isinstance(top, tuple): raise ValueError("fan without a matching exit")
+      side, levels[level] = top
+    ##
+  elif kind == _CROISSANT:
+    if side: levels[level - span + 1:level - span + 1] = [None] * span
+    else: del levels[level - span + 1:level + 1]
+  elif side:
+    levels[level:level + 2] = [_Pair(levels[level], levels[level + 1])]
+  else:
+    top = levels[level]
+    if isinstance(top, tuple): raise ValueError("malformed interaction net")
+    levels[level:level + 1] = [None, None] if top is None else [top.first, top.second]
+  ##
+  return tuple(levels), side
+##
+
+def _scope(context: _Context, level: int) -> _Context:
+  end = min(level, len(context))
+  while end and context[end - 1] is None:
+    end -= 1
+  ##
+  return context[:end]
+##
+
+def normalize(expr: Expr, oracle: bool = True) -> Expr:
+  net = _build(expr, oracle)
+  link, kind = net.link, net.kind
+  depths: dict[tuple[int, _Context], int] = {}
+  out: list[Expr] = []
+  todo: list[tuple[int, int, _Context]] = [(0, 0, ())]
+  while todo:
+    p, depth, context = todo.pop()
+    if p < 0:
+      if depth < 0:
+        out.append(eta_func(out.pop()))
+      else:
+        args = out[len(out) - depth:]
+        del out[len(out) - depth:]
+        head = out.pop()
+        for arg in args:
+          head = Appl(head, arg)
+        ##
+        out.append(head)
+      ##
+      continue
+    ##
+    back: list[tuple[int, _Context, int]] = []
+    spine: list[tuple[int, _Context]] = []
+    while True:
+      q = link[p]
+      n, s = divmod(q, 3)
+      k = kind[n]
+      if s == 0 and p % 3 == 0 and net.interacts(p // 3, n):
+        net.rewrite(p // 3, n)
+        p, context, size = back.pop()
+        del spine[size:]
+        continue
+      ##
+      if k == _LAM and s == 0:
+        depths[n, _scope(context, net.level[n]) if oracle else ()] = depth
+        todo.append((-1, -1, ()))
+        todo.append((3 * n + 2, depth + 1, context))
+        break
+      ##
+      if k == _LAM and s == 1 or k == _FREE:
+        if k == _LAM:
+          key = (n, _scope(context, net.level[n]) if oracle else ())
+          if key not in depths: raise ValueError("variable outside its binder")
+          level = depths[key]
+        else:
+          level = net.level[n]
+        ##
+        out.append(Var(depth - 1 - level))
+        todo.append((-1, len(spine), ()))
+        todo.extend((arg, depth, arg_context) for arg, arg_context in spine)
+        break
+      ##
+      if k == _APP and s == 2:
+        back.append((p, context, len(spine)))
+        spine.append((3 * n + 1, context))
+        p = 3 * n
+      elif k >= _FAN and k <= _BRACKET:
+        if k == _CROISSANT: net.merge(n, s)
+        if s: back.append((p, context, len(spine)))
+        context, side = _cross(context, k, net.level[n], net.span[n], s)
+        p = 3 * n if s else 3 * n + side if k == _FAN else 3 * n + 1
+      else:
+        raise ValueError("malformed interaction net")
+      ##
+    ##
+  ##
+  return out[0]
+##
@@ -0,0 +1,130 @@
+from dataclasses import dataclass
+from mockingbird.ast import Appl, Expr, Func, Var, beta_reduce, eta_func
+
+@dataclass(frozen=True, slots=True, eq=False)
+class _Closure:
+  expr: Expr
+  env: _Env
+##
+
+type _Value = _Closure | int
+type _Env = tuple[_Value, _Env] | None
+
+def _lookup(env: _Env, index: int) -> _Value:
+  while index and env is not None:
+    env = env[1]
+    index -= 1
+  ##
+  if env is None: return -index - 1
+  return env[0]
+##
+
+def _close(expr: Expr, env: _Env) -> _Value:
+  if isinstance(expr, Var): return _lookup(env, expr.index)
+  if expr.max_free < 0: return _Closure(expr, None)
+  return _Closure(expr, env)
+##
+
+def _whnf(expr: Expr, env: _Env, stack: list[_Value]) -> tuple[Func, _Env] | int:
+  while True:
+    if isinstance(expr, Appl):
+      stack.append(_close(expr.arg, env))
+      expr = expr.func
+    elif isinstance(expr, Func):
+      if not stack: return (expr, env)
+      env = (stack.pop(), env)
+      expr = expr.body
+    else:
+      value = _lookup(env, expr.index)
+      if isinstance(value, int): return value
+      expr = value.expr
+      env = value.env
+    ##
+  ##
+##
+
+def _unload(value: _Value) -> Expr:
+  if isinstance(value, int): return Var(-value - 1)
+  done: dict[int, Expr] = {}
+  todo: list[_Closure] = [value]
+  while todo:
+    closure = todo[-1]
+    if id(closure) in done:
+      todo.pop()
+      continue
+    ##
+    values: list[_Value] = []
+    env = closure.env
+    while env is not None and len(values) <= closure.expr.max_free:
+      values.append(env[0])
+      env = env[1]
+    ##
+    pending = [v for v in values if isinstance(v, _Closure) and id(v) not in done]
+    if pending:
+      todo.extend(pending)
+      continue
+    ##
+    todo.pop()
+    expr = closure.expr
+    for _ in values:
+      expr = Func(expr)
+    ##
+    for v in reversed(values):
+      assert isinstance(expr, Func)
+      expr = beta_reduce(expr.body, Var(-v - 1) if isinstance(v, int) else done[id(v)])
+    ##
+    done[id(closure)] = expr
+  ##
+  return done[id(value)]
+##
+
+def whnf(expr: Expr) -> Expr:
+  stack: list[_Value] = []
+  result = _whnf(expr, None, stack)
+  if isinstance(result, int):
+    head: Expr = Var(-result - 1)
+    while stack:
+      head = Appl(head, _unload(stack.pop()))
+    ##
+    return head
+  ##
+  return _unload(_Closure(*result))
+##
+
+_EVAL = 0
+_LAM = 1
+_APPL = 2
+
+type _Task = tuple[int, _Value | Expr | None, int]
+
+def normalize(expr: Expr) -> Expr:
+  out: list[Expr] = []
+  todo: list[_Task] = [(_EVAL, _Closure(expr, None), 0)]
+  while todo:
+    tag, item, n = todo.pop()
+    if tag == _LAM:
+      out.append(eta_func(out.pop()))
+    elif tag == _APPL:
+      head = item
+      for arg in out[len(out) - n:]:
+        head = Appl(head, arg)
+      ##
+      del out[len(out) - n:]
+      out.append(head)
+    elif isinstance(item, int):
+      out.append(Var(n - item - 1))
+    else:
+      stack: list[_Value] = []
+      result = _whnf(item.expr, item.env, stack)
+      if isinstance(result, int):
+        todo.append((_APPL, Var(n - result - 1), len(stack)))
+        todo.extend((_EVAL, arg, n) for arg in stack)
+      else:
+        func, env = result
+        todo.append((_LAM, None, 0))
+        todo.append((_EVAL, _Closure(func.body, (n, env)), n + 1))
+      ##
+    ##
+  ##
+  return out[0]
+##
@@ -0,0 +1,144 @@
+from dataclasses import dataclass
+from mockingbird.ast import Appl, Expr, Func, Var, eta_func
+
+class _Thunk:
+  __slots__ = ('expr', 'env', 'value')
+
+  def __init__(self, expr: Expr, env: _Env) -> None:
+    self.expr: Expr | None = expr
+    self.env = env
+    self.value: tuple[Func, _Env] | _Neutral | None = None
+  ##
+
+  def update(self, value: tuple[Func, _Env] | _Neutral) -> None:
+    self.value = value
+    self.expr = None
+    self.env = None
+  ##
+##
+
+@dataclass(frozen=True, slots=True, eq=False)
+class _Neutral:
+  head: int
+  args: tuple[_Value, ...]
+##
+
+@dataclass(frozen=True, slots=True, eq=False)
+class _Update:
+  thunk: _Thunk
+##
+
+type _Value = _Thunk | int
+type _Env = tuple[_Value, _Env] | None
+
+def _lookup(env: _Env, index: int) -> _Value:
+  while index and env is not None:
+    env = env[1]
+    index -= 1
+  ##
+  if env is None: return -index - 1
+  return env[0]
+##
+
+def _delay(expr: Expr, env: _Env) -> _Value:
+  if isinstance(expr, Var): return _lookup(env, expr.index)
+  if expr.max_free < 0: return _Thunk(expr, None)
+  return _Thunk(expr, env)
+##
+
+def _neutral(head: int, args: list[_Value], stack: list[_Value | _Update]) -> _Neutral:
+  while True:
+    while stack and not isinstance(stack[-1], _Update):
+      args.append(stack.pop())
+    ##
+    if not stack: return _Neutral(head, tuple(args))
+    update = stack.pop()
+    assert isinstance(update, _Update)
+    update.thunk.update(_Neutral(head, tuple(args)))
+  ##
+##
+
+def _whnf(expr: Expr, env: _Env, stack: list[_Value | _Update]) -> tuple[Func, _Env] | _Neutral:
+  while True:
+    if isinstance(expr, Appl):
+      stack.append(_delay(expr.arg, env))
+      expr = expr.func
+    elif isinstance(expr, Func):
+      if not stack: return (expr, env)
+      top = stack.pop()
+      if isinstance(top, _Update):
+        top.thunk.update((expr, env))
+      else:
+        env = (top, env)
+        expr = expr.body
+      ##
+    else:
+      value = _lookup(env, expr.index)
+      if isinstance(value, int): return _neutral(value, [], stack)
+      if value.value is None:
+        assert value.expr is not None
+        stack.append(_Update(value))
+        env = value.env
+        expr = value.expr
+      elif isinstance(value.value, _Neutral):
+        return _neutral(value.value.head, list(value.value.args), stack)
+      else:
+        expr, env = value.value
+      ##
+    ##
+  ##
+##
+
+def _force(thunk: _Thunk) -> tuple[Func, _Env] | _Neutral:
+  if thunk.value is None:
+    assert thunk.expr is not None
+    _whnf(thunk.expr, thunk.env, [_Update(thunk)])
+  ##
+  assert thunk.value is not None
+  return thunk.value
+##
+
+_EVAL = 0
+_LAM = 1
+_APPL = 2
+_MEMO = 3
+
+type _Task = tuple[int, _Value | Expr | None, int]
+
+def normalize(expr: Expr) -> Expr:
+  memo: dict[tuple[_Thunk, int], Expr] = {}
+  out: list[Expr] = []
+  todo: list[_Task] = [(_EVAL, _Thunk(expr, None), 0)]
+  while todo:
+    tag, item, n = todo.pop()
+    if tag == _LAM:
+      out.append(eta_func(out.pop()))
+    elif tag == _APPL:
+      head = item
+      for arg in out[len(out) - n:]:
+        head = Appl(head, arg)
+      ##
+      del out[len(out) - n:]
+      out.append(head)
+    elif tag == _MEMO:
+      memo[item, n] = out[-1]
+    elif isinstance(item, int):
+      out.append(Var(n - item - 1))
+    elif (result := memo.get((item, n))) is not None:
+      out.append(result)
+    else:
+      assert isinstance(item, _Thunk)
+      todo.append((_MEMO, item, n))
+      value = _force(item)
+      if isinstance(value, _Neutral):
+        todo.append((_APPL, Var(n - value.head - 1), len(value.args)))
+        todo.extend((_EVAL, arg, n) for arg in reversed(value.args))
+      else:
+        func, env = value
+        todo.append((_LAM, None, 0))
+        todo.append((_EVAL, _Thunk(func.body, (n, env)), n + 1))
+      ##
+    ##
+  ##
+  return out[0]
+##
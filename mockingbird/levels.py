@@ -0,0 +1,139 @@
+from mockingbird.ast import Appl, Expr, Func, Var, eta_func
+
+_BOUND = 0
+_FREE = 1
+_LAM = 2
+_APP = 3
+
+class _Term:
+  __slots__ = ('kind', 'a', 'b', 'top')
+
+  def __init__(self, kind: int, a: object, b: _Term | None = None) -> None:
+    self.kind = kind
+    self.a = a
+    self.b = b
+    if kind == _BOUND: self.top = a
+    elif kind == _FREE: self.top = -1
+    elif kind == _LAM: self.top = a.top - 1
+    else: self.top = max(a.top, b.top)
+  ##
+##
+
+def _key(expr: Expr, depth: int) -> tuple[Expr, int]:
+  return (expr, depth if expr.max_free >= depth else -1)
+##
+
+def _from_expr(expr: Expr) -> _Term:
+  done: dict[tuple[Expr, int], _Term] = {}
+  todo: list[tuple[Expr, int, bool]] = [(expr, 0, False)]
+  while todo:
+    node, depth, ready = todo.pop()
+    key = _key(node, depth)
+    if key in done: continue
+    if isinstance(node, Var):
+      done[key] = _Term(_BOUND, node.index) if node.index < depth else _Term(_FREE, depth - 1 - node.index)
+    elif not ready:
+      todo.append((node, depth, True))
+      if isinstance(node, Func):
+        todo.append((node.body, depth + 1, False))
+      else:
+        todo.append((node.arg, depth, False))
+        todo.append((node.func, depth, False))
+      ##
+    elif isinstance(node, Func):
+      done[key] = _Term(_LAM, done[_key(node.body, depth + 1)])
+    else:
+      done[key] = _Term(_APP, done[_key(node.func, depth)], done[_key(node.arg, depth)])
+    ##
+  ##
+  return done[_key(expr, 0)]
+##
+
+def _instantiate(body: _Term, arg: _Term) -> _Term:
+  done: dict[tuple[int, int], _Term] = {}
+  todo: list[tuple[_Term, int]] = [(body, 0)]
+  out: list[_Term] = []
+  while todo:
+    node, depth = todo.pop()
+    if depth < 0:
+      depth = ~depth
+      if node.kind == _LAM:
+        result = _Term(_LAM, out.pop())
+      else:
+        b = out.pop()
+        result = _Term(_APP, out.pop(), b)
+      ##
+      done[id(node), depth] = result
+      out.append(result)
+    elif node.top < depth:
+      out.append(node)
+    elif node.kind == _BOUND:
+      out.append(arg)
+    elif (result := done.get((id(node), depth))) is not None:
+      out.append(result)
+    else:
+      todo.append((node, ~depth))
+      if node.kind == _LAM:
+        todo.append((node.a, depth + 1))
+      else:
+        todo.append((node.b, depth))
+        todo.append((node.a, depth))
+      ##
+    ##
+  ##
+  return out[0]
+##
+
+def _whnf(term: _Term) -> tuple[_Term, list[_Term]]:
+  args: list[_Term] = []
+  while True:
+    if term.kind == _APP:
+      args.append(term.b)
+      term = term.a
+    elif term.kind == _LAM and args:
+      term = _instantiate(term.a, args.pop())
+    else:
+      return term, args
+    ##
+  ##
+##
+
+_EVAL = 0
+_FUNC = 1
+_APPL = 2
+_MEMO = 3
+
+def normalize(expr: Expr) -> Expr:
+  memo: dict[tuple[int, int], tuple[_Term, Expr]] = {}
+  out: list[Expr] = []
+  todo: list[tuple[int, _Term | None, int]] = [(_EVAL, _from_expr(expr), 0)]
+  while todo:
+    tag, term, n = todo.pop()
+    if tag == _FUNC:
+      out.append(eta_func(out.pop()))
+    elif tag == _APPL:
+      head = out[len(out) - n - 1]
+      for arg in out[len(out) - n:]:
+        head = Appl(head, arg)
+      ##
+      del out[len(out) - n - 1:]
+      out.append(head)
+    elif tag == _MEMO:
+      memo[id(term), n] = (term, out[-1])
+    elif (hit := memo.get((id(term), n))) is not None:
+      out.append(hit[1])
+    else:
+      todo.append((_MEMO, term, n))
+      head, args = _whnf(term)
+      if head.kind == _LAM:
+        todo.append((_FUNC, None, 0))
+        todo.append((_EVAL, _instantiate(head.a, _Term(_FREE, n)), n + 1))
+      else:
+        out.append(Var(n - 1 - head.a))
+        todo.append((_APPL, None, len(args)))
+        todo.extend((_EVAL, arg, n) for arg in args)
+      ##
+    ##
+  ##
+  return out[0]
+##
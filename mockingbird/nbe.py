@@ -0,0 +1,162 @@
+from collections.abc import Callable
+from dataclasses import dataclass
+from mockingbird.ast import Appl, Expr, Func, Var, eta_func
+
+class _Lazy:
+  __slots__ = ('code', 'env', 'value')
+
+  def __init__(self, code: _Code | None, env: _Env, value: _Value | None = None) -> None:
+    self.code = code
+    self.env = env
+    self.value = value
+  ##
+
+  def force(self) -> _Value:
+    return _run(self)
+  ##
+##
+
+@dataclass(frozen=True, slots=True, eq=False)
+class _Neutral:
+  head: int
+  args: _Args
+##
+
+type _Args = tuple[_Lazy, _Args] | None
+type _Value = Callable[[_Lazy], _State] | _Neutral
+type _Env = tuple[_Lazy, _Env] | None
+type _Call = tuple[_Code, _Env, list[_Lazy]]
+type _State = _Value | _Lazy | _Call
+type _Code = Callable[[_Env], _State]
+
+def _run(state: _State) -> _Value:
+  stack: list[_Lazy | list[_Lazy]] = []
+  while True:
+    if isinstance(state, _Lazy):
+      if state.code is None:
+        assert state.value is not None
+        state = state.value
+      else:
+        stack.append(state)
+        state = state.code(state.env)
+      ##
+    elif isinstance(state, tuple):
+      head, env, args = state
+      stack.append(args)
+      state = head(env)
+    elif not stack:
+      return state
+    else:
+      top = stack.pop()
+      if isinstance(top, _Lazy):
+        top.value = state
+        top.code = None
+        top.env = None
+      elif isinstance(state, _Neutral):
+        rest = state.args
+        while top:
+          rest = (top.pop(), rest)
+        ##
+        state = _Neutral(state.head, rest)
+      else:
+        arg = top.pop()
+        if top: stack.append(top)
+        state = state(arg)
+      ##
+    ##
+  ##
+##
+
+def _var(index: int) -> _Code:
+  if index == 0: return lambda env: env[0] if env is not None else _Neutral(-1, None)
+  def code(env: _Env) -> _State:
+    i = index
+    while i and env is not None:
+      env = env[1]
+      i -= 1
+    ##
+    if env is None: return _Neutral(-i - 1, None)
+    return env[0]
+  ##
+  return code
+##
+
+def _func(body: _Code) -> _Code:
+  return lambda env: lambda arg: body((arg, env))
+##
+
+def _appl(head: _Code, args: list[tuple[_Code, _Lazy | None]]) -> _Code:
+  args = args[::-1]
+  def code(env: _Env) -> _State:
+    return (head, env, [shared or _Lazy(arg, env) for arg, shared in args])
+  ##
+  return code
+##
+
+def _compile(expr: Expr) -> _Code:
+  done: dict[Expr, _Code] = {}
+  todo: list[tuple[Expr, bool]] = [(expr, False)]
+  while todo:
+    node, ready = todo.pop()
+    if node in done: continue
+    if isinstance(node, Var):
+      done[node] = _var(node.index)
+      continue
+    ##
+    spine: list[Expr] = []
+    head = node
+    while isinstance(head, Appl):
+      spine.append(head.arg)
+      head = head.func
+    ##
+    children = [head.body] if isinstance(node, Func) else [head, *spine]
+    if not ready:
+      todo.append((node, True))
+      todo.extend((child, False) for child in children if child not in done)
+      continue
+    ##
+    if isinstance(node, Func):
+      done[node] = _func(done[node.body])
+    else:
+      args = [(done[arg], _Lazy(done[arg], None) if arg.max_free < 0 else None) for arg in reversed(spine)]
+      done[node] = _appl(done[head], args)
+    ##
+  ##
+  return done[expr]
+##
+
+_EVAL = 0
+_LAM = 1
+_APPL = 2
+
+def nbe_normalize(expr: Expr) -> Expr:
+  out: list[Expr] = []
+  todo: list[tuple[int, _Value | Expr | None, int]] = [(_EVAL, _run(_compile(expr)(None)), 0)]
+  while todo:
+    tag, item, n = todo.pop()
+    if tag == _LAM:
+      out.append(eta_func(out.pop()))
+    elif tag == _APPL:
+      head = item
+      for arg in out[len(out) - n:]:
+        head = Appl(head, arg)
+      ##
+      del out[len(out) - n:]
+      out.append(head)
+    elif isinstance(item, _Neutral):
+      args: list[_Lazy] = []
+      rest = item.args
+      while rest is not None:
+        args.append(rest[0])
+        rest = rest[1]
+      ##
+      todo.append((_APPL, Var(n - item.head - 1), len(args)))
+      todo.extend((_EVAL, arg.force(), n) for arg in args)
+    else:
+      assert callable(item)
+      todo.append((_LAM, None, 0))
+      todo.append((_EVAL, _run(item(_Lazy(None, None, _Neutral(n, None)))), n + 1))
+    ##
+  ##
+  return out[0]
+##
@@ -0,0 +1,54 @@
+from io import StringIO
+from typing import TextIO
+from mockingbird.ast import Expr, Func, Var
+
+ELLIPSIS = "…"
+
+_CHUNK = 4096
+
+def write(expr: Expr, out: TextIO, max_length: int | None = None, max_depth: int | None = None) -> int:
+  parts: list[str] = []
+  size = 0
+  written = 0
+  todo: list[tuple[Expr | str, int]] = [(expr, 0)]
+  while todo:
+    item, depth = todo.pop()
+    if isinstance(item, str):
+      text = item
+    elif isinstance(item, Var):
+      text = str(item.index)
+    elif max_depth is not None and depth >= max_depth:
+      text = ELLIPSIS
+    elif isinstance(item, Func):
+      todo.append((item.body, depth + 1))
+      todo.append(("λ ", depth))
+      continue
+    else:
+      if isinstance(item.arg, Var): todo.append((item.arg, depth + 1))
+      else: todo.extend(((")", depth), (item.arg, depth + 1), ("(", depth)))
+      todo.append((" ", depth))
+      if isinstance(item.func, Func): todo.extend(((")", depth), (item.func, depth + 1), ("(", depth)))
+      else: todo.append((item.func, depth + 1))
+      continue
+    ##
+    parts.append(text)
+    size += len(text)
+    if max_length is not None:
+      if size > max_length: break
+    elif len(parts) >= _CHUNK:
+      written += out.write("".join(parts))
+      parts.clear()
+    ##
+  ##
+  text = "".join(parts)
+  if max_length is not None and size > max_length:
+    text = text[:max_length - 1] + ELLIPSIS if max_length > 0 else ""
+  ##
+  return written + out.write(text)
+##
+
+def render(expr: Expr, max_length: int | None = None, max_depth: int | None = None) -> str:
+  out = StringIO()
+  write(expr, out, max_length, max_depth)
+  return out.getvalue()
+##
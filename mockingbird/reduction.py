@@ -0,0 +1,468 @@
+from collections import OrderedDict
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass
+from enum import Enum
+from time import monotonic
+from mockingbird import church
+from mockingbird.ast import Appl, Expr, Func, HashContext, Var, beta_reduce, hash_context, plug_hash
+
+class Strategy(Enum):
+  NORMAL = 'normal'
+  APPLICATIVE = 'applicative'
+  CALL_BY_VALUE = 'call_by_value'
+  CALL_BY_NAME = 'call_by_name'
+  HEAD = 'head'
+  WEAK_HEAD = 'weak_head'
+##
+
+class Limit(Enum):
+  STEPS = 'steps'
+  SIZE = 'size'
+  TIME = 'time'
+  CYCLE = 'cycle'
+##
+
+@dataclass(frozen=True, slots=True)
+class Result:
+  expr: Expr
+  steps: int
+  normal: bool
+  limit: Limit | None = None
+  period: int | None = None
+##
+
+class Rule(Enum):
+  BETA = 'beta'
+  ETA = 'eta'
+##
+
+@dataclass(frozen=True, slots=True)
+class TraceStep:
+  step: int
+  path: tuple[int, ...]
+  rule: Rule
+  size_delta: int
+  expr: Expr | None = None
+##
+
+_ARG = 0
+_HEAD = 1
+_LAM = 2
+_MEMO = 3
+
+type _Frame = tuple[int, Expr | None]
+type _Chain = tuple[_Frame, _Chain] | None
+
+_MODES: dict[Strategy, tuple[bool, bool, bool]] = {
+  Strategy.NORMAL: (False, False, True),
+  Strategy.APPLICATIVE: (False, True, True),
+  Strategy.CALL_BY_VALUE: (True, True, True),
+  Strategy.CALL_BY_NAME: (True, False, True),
+  Strategy.HEAD: (False, False, False),
+  Strategy.WEAK_HEAD: (True, False, False),
+}
+
+def _plug(frames: Iterable[_Frame], focus: Expr) -> Expr:
+  for tag, node in frames:
+    if tag == _ARG: focus = Appl(focus, node)
+    elif tag == _HEAD: focus = Appl(node, focus)
+    elif tag == _LAM: focus = Func(focus)
+  ##
+  return focus
+##
+
+def _unchain(chain: _Chain) -> Iterator[_Frame]:
+  while chain is not None:
+    frame, chain = chain
+    yield frame
+  ##
+##
+
+def _climb(frames: list[_Frame], focus: Expr) -> Expr:
+  while frames:
+    tag, node = frames[-1]
+    if tag == _LAM:
+      if not (isinstance(focus, Appl) and focus.arg is Var(0) and not focus.func.is_free(0)): break
+      frames.pop()
+      focus = Func(focus)
+    elif tag == _HEAD and focus is Var(0) and len(frames) >= 2 and frames[-2][0] == _LAM and not node.is_free(0):
+      frames.pop()
+      frames.pop()
+      focus = Func(Appl(node, focus))
+    else:
+      break
+    ##
+  ##
+  return focus
+##
+
+class NormalFormCache:
+
+  def __init__(self, max_nodes: int = 1 << 20) -> None:
+    self.max_nodes = max_nodes
+    self.nodes = 0
+    self.hits = 0
+    self.misses = 0
+    self.evictions = 0
+    self._entries: OrderedDict[Expr, Expr] = OrderedDict()
+  ##
+
+  def __len__(self) -> int:
+    return len(self._entries)
+  ##
+
+  def get(self, expr: Expr) -> Expr | None:
+    result = self._entries.get(expr)
+    if result is None:
+      self.misses += 1
+      return None
+    ##
+    self._entries.move_to_end(expr)
+    self.hits += 1
+    return result
+  ##
+
+  def put(self, expr: Expr, normal: Expr) -> None:
+    nodes = expr.size + normal.size
+    if nodes > self.max_nodes or expr in self._entries: return
+    entries = self._entries
+    while self.nodes + nodes > self.max_nodes:
+      key, value = entries.popitem(last=False)
+      self.nodes -= key.size + value.size
+      self.evictions += 1
+    ##
+    entries[expr] = normal
+    self.nodes += nodes
+  ##
+
+  def clear(self) -> None:
+    self._entries.clear()
+    self.nodes = 0
+  ##
+##
+
+class _Machine:
+
+  def __init__(self, expr: Expr, strategy: Strategy = Strategy.NORMAL) -> None:
+    self.focus = expr
+    self.frames: list[_Frame] = []
+    self.weak, self.strict, self.args = _MODES[strategy]
+    self.eta = False
+    self.fuse = False
+    self.up = False
+    self.done = False
+    self.track = False
+    self.measured: int | None = None
+    self.max_size: int | None = None
+    self.deadline: float | None = None
+    self.limit: Limit | None = None
+    self.window: int | None = None
+    self.seen: dict[tuple[int, int], int] = {}
+    self.contexts: list[HashContext] = [(1, 0)]
+    self.low = 0
+    self.total = 0
+    self.period: int | None = None
+    self.cache: NormalFormCache | None = None
+  ##
+
+  def expr(self) -> Expr:
+    return _plug(reversed(self.frames), self.focus)
+  ##
+
+  def size(self) -> int:
+    size = self.focus.size
+    for tag, node in self.frames:
+      if tag != _MEMO: size += 1 if node is None else node.size + 1
+    ##
+    return size
+  ##
+
+  def fingerprint(self, focus: Expr) -> int:
+    frames = self.frames
+    contexts = self.contexts
+    low = min(self.low, len(frames))
+    del contexts[low + 1:]
+    for tag, node in frames[low:]:
+      if tag == _MEMO: contexts.append(contexts[-1])
+      else: contexts.append(hash_context(contexts[-1], node, 1 if tag == _HEAD else 0))
+    ##
+    self.low = len(frames)
+    return plug_hash(contexts[-1], focus)
+  ##
+
+  def _remember(self, focus: Expr, size: int, step: int) -> int | None:
+    key = (self.fingerprint(focus), size)
+    seen = self.seen
+    previous = seen.pop(key, None)
+    if previous is not None: return step - previous
+    if len(seen) >= self.window: del seen[next(iter(seen))]
+    seen[key] = step
+    return None
+  ##
+
+  def _check(self, focus: Expr, size: int, steps: int) -> Limit | None:
+    if self.max_size is not None and size > self.max_size: return Limit.SIZE
+    if self.deadline is not None and not steps % 64 and monotonic() > self.deadline: return Limit.TIME
+    if self.window is not None:
+      self.period = self._remember(focus, size, self.total + steps)
+      if self.period is not None: return Limit.CYCLE
+    ##
+    return None
+  ##
+
+  def run(self, limit: int | None = None) -> int:
+    if self.done: return 0
+    budget = self.track or self.max_size is not None or self.deadline is not None or self.window is not None
+    size = 0
+    if budget: size = self.size() if self.measured is None else self.measured
+    self.limit = None
+    if self.window is not None and self.total == 0 and not self.seen:
+      self._remember(self.focus, size, 0)
+    ##
+    focus = self.focus
+    frames = self.frames
+    weak, strict, args = self.weak, self.strict, self.args
+    eta = self.eta
+    fuse = self.fuse
+    up = self.up
+    cache = None if eta else self.cache
+    zero = Var(0)
+    steps = 0
+    while True:
+      if up:
+        up = False
+      elif isinstance(focus, Appl):
+        frames.append((_ARG, focus.arg))
+        focus = focus.func
+        continue
+      elif isinstance(focus, Func):
+        body = focus.body
+        if eta:
+          if isinstance(body, Appl) and body.arg is zero and not body.func.is_free(0):
+            if steps == limit: break
+            focus = _climb(frames, body.func.shift(-1))
+            size -= 3
+            steps += 1
+            if budget and len(frames) < self.low: self.low = len(frames)
+            continue
+          ##
+        elif not strict and frames and frames[-1][0] == _ARG:
+          if steps == limit: break
+          arg = frames.pop()[1]
+          size -= focus.size + arg.size + 1
+          focus = beta_reduce(body, arg)
+          steps += 1
+          if budget:
+            if len(frames) < self.low: self.low = len(frames)
+            size += focus.size
+            if (hit := self._check(focus, size, steps)) is not None:
+              self.limit = hit
+              break
+            ##
+          ##
+          continue
+        ##
+        if not weak:
+          frames.append((_LAM, None))
+          focus = body
+          if cache is not None and not isinstance(body, Var):
+            if (hit := cache.get(body)) is not None:
+              focus = hit
+              up = True
+              if budget and hit is not body:
+                size += hit.size - body.size
+                self.limit = self._check(focus, size, steps)
+                if self.limit is not None: break
+              ##
+            else:
+              frames.append((_MEMO, body))
+            ##
+          ##
+          continue
+        ##
+      ##
+      while frames:
+        tag, node = frames.pop()
+        if tag == _ARG:
+          if args:
+            frames.append((_HEAD, focus))
+            focus = node
+            if cache is not None and not isinstance(node, Var):
+              if (hit := cache.get(node)) is not None:
+                focus = hit
+                if budget and hit is not node:
+                  size += hit.size - node.size
+                  self.limit = self._check(focus, size, steps)
+                  if self.limit is not None:
+                    up = True
+                    break
+                  ##
+                ##
+                continue
+              ##
+              frames.append((_MEMO, node))
+            ##
+            break
+          ##
+          focus = Appl(focus, node)
+        elif tag == _HEAD:
+          if strict and not eta and isinstance(node, Func):
+            if steps == limit:
+              frames.append((tag, node))
+              up = True
+              break
+            ##
+            size -= node.size + focus.size + 1
+            focus = beta_reduce(node.body, focus)
+            steps += 1
+            if budget:
+              size += focus.size
+              self.limit = self._check(focus, size, steps)
+            ##
+            break
+          ##
+          focus = Appl(node, focus)
+        elif tag == _LAM:
+          if fuse and isinstance(focus, Appl) and focus.arg is zero and not focus.func.is_free(0):
+            focus = focus.func.shift(-1)
+            steps += 1
+          else:
+            focus = Func(focus)
+          ##
+        else:
+          cache.put(node, focus)
+        ##
+      else:
+        if eta or fuse or weak or not args:
+          self.done = True
+          break
+        ##
+        eta = True
+        cache = None
+      ##
+      if budget and len(frames) <= self.low: self.low = max(len(frames) - 1, 0)
+      if up or self.limit is not None: break
+    ##
+    self.focus = focus
+    self.eta = eta
+    self.up = up
+    self.total += steps
+    if budget: self.measured = size
+    return steps
+  ##
+##
+
+class Snapshot:
+  __slots__ = ('_focus', '_chain', '_expr')
+
+  def __init__(self, focus: Expr, chain: _Chain) -> None:
+    self._focus = focus
+    self._chain = chain
+    self._expr: Expr | None = None
+  ##
+
+  @property
+  def expr(self) -> Expr:
+    if self._expr is None:
+      self._expr = _plug(_unchain(self._chain), self._focus)
+      self._chain = None
+    ##
+    return self._expr
+  ##
+##
+
+class Stepper:
+
+  def __init__(self, expr: Expr, strategy: Strategy = Strategy.NORMAL) -> None:
+    self._machine = _Machine(expr, strategy)
+    self._machine.track = True
+    self._chain: list[_Chain] = [None]
+    self.steps = 0
+  ##
+
+  @property
+  def expr(self) -> Expr:
+    return self._machine.expr()
+  ##
+
+  @property
+  def done(self) -> bool:
+    return self._machine.done
+  ##
+
+  def __iter__(self) -> Stepper:
+    return self
+  ##
+
+  def __next__(self) -> Snapshot:
+    machine = self._machine
+    if machine.run(1) == 0: raise StopIteration
+    self.steps += 1
+    frames = machine.frames
+    chain = self._chain
+    low = min(machine.low, len(frames))
+    del chain[low + 1:]
+    for frame in frames[low:]:
+      chain.append((frame, chain[-1]))
+    ##
+    machine.low = len(frames)
+    return Snapshot(machine.focus, chain[-1])
+  ##
+##
+
+def trace(expr: Expr, every: int | None = None, strategy: Strategy = Strategy.NORMAL) -> Iterator[TraceStep]:
+  machine = _Machine(expr, strategy)
+  machine.track = True
+  machine.run(0)
+  frames = machine.frames
+  sides: list[int] = []
+  steps = 0
+  while not machine.done:
+    low = min(machine.low, len(frames))
+    del sides[low:]
+    sides.extend(1 if tag == _HEAD else 0 for tag, _ in frames[low:])
+    machine.low = len(frames)
+    rule = Rule.ETA if machine.eta else Rule.BETA
+    path = tuple(sides) if machine.eta else tuple(sides[:-1])
+    size = machine.measured
+    machine.run(1)
+    steps += 1
+    term = machine.expr() if every is not None and steps % every == 0 else None
+    yield TraceStep(steps, path, rule, machine.measured - size, term)
+  ##
+##
+
+def normalize(
+    expr: Expr, max_steps: int | None = None, strategy: Strategy = Strategy.NORMAL,
+    max_size: int | None = None, timeout: float | None = None, cycle_window: int | None = None,
+    cache: NormalFormCache | None = None, accelerate: bool = False,
+) -> Result:
+  if accelerate:
+    if strategy not in (Strategy.NORMAL, Strategy.APPLICATIVE):
+      raise ValueError(f"acceleration needs a normalizing strategy, not {strategy.value}")
+    ##
+    expr = church.accelerate(expr)
+  ##
+  machine = _Machine(expr, strategy)
+  if cache is not None:
+    if strategy not in (Strategy.NORMAL, Strategy.APPLICATIVE):
+      raise ValueError(f"normal form cache needs a normalizing strategy, not {strategy.value}")
+    ##
+    machine.cache = cache
+    if (hit := cache.get(expr)) is not None and (max_size is None or hit.size <= max_size):
+      machine.focus = hit
+      machine.up = True
+    else:
+      machine.frames.append((_MEMO, expr))
+    ##
+  ##
+  unbounded = max_steps is None and max_size is None and timeout is None and cycle_window is None
+  machine.fuse = strategy is Strategy.NORMAL and unbounded and cache is None
+  machine.max_size = max_size
+  machine.window = cycle_window
+  if timeout is not None: machine.deadline = monotonic() + timeout
+  steps = machine.run(max_steps)
+  limit = machine.limit
+  if limit is None and not machine.done: limit = Limit.STEPS
+  return Result(machine.expr(), steps, machine.done, limit, machine.period)
+##
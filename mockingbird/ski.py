@@ -0,0 +1,262 @@
+from dataclasses import dataclass, field
+from enum import Enum
+from mockingbird.ast import Appl, Expr, Func, Var, eta_func
+
+class Comb(Enum):
+  S = 'S'
+  K = 'K'
+  I = 'I'
+  B = 'B'
+  C = 'C'
+##
+
+@dataclass(frozen=True, slots=True, repr=False, eq=False)
+class Ap:
+  func: Term
+  arg: Term
+  top: int = field(init=False)
+  _hash: int = field(init=False)
+
+  def __post_init__(self) -> None:
+    object.__setattr__(self, 'top', max(_top(self.func), _top(self.arg)))
+    object.__setattr__(self, '_hash', hash((self.func, self.arg)))
+  ##
+
+  def __hash__(self) -> int:
+    return self._hash
+  ##
+
+  def __eq__(self, other: object) -> bool:
+    if not isinstance(other, Ap): return NotImplemented
+    seen: set[tuple[int, int]] = set()
+    todo: list[tuple[Term, Term]] = [(self, other)]
+    while todo:
+      a, b = todo.pop()
+      if a is b: continue
+      if isinstance(a, Ap) and isinstance(b, Ap):
+        if a._hash != b._hash: return False
+        if (id(a), id(b)) in seen: continue
+        seen.add((id(a), id(b)))
+        todo.append((a.arg, b.arg))
+        todo.append((a.func, b.func))
+      elif isinstance(a, Ap) or isinstance(b, Ap) or a != b:
+        return False
+      ##
+    ##
+    return True
+  ##
+
+  def __repr__(self) -> str:
+    parts: list[str] = []
+    todo: list[Term | str] = [self]
+    while todo:
+      item = todo.pop()
+      if isinstance(item, str):
+        parts.append(item)
+      elif isinstance(item, Ap):
+        parts.append("Ap(func=")
+        todo.extend((")", item.arg, ", arg=", item.func))
+      else:
+        parts.append(repr(item))
+      ##
+    ##
+    return "".join(parts)
+  ##
+##
+
+type Term = Comb | Ap | int
+
+_NONE = -(1 << 62)
+
+_ARITY = {Comb.S: 3, Comb.K: 2, Comb.I: 1, Comb.B: 3, Comb.C: 3}
+
+_DEFINITIONS = {
+  Comb.S: Func(Func(Func(Appl(Appl(Var(2), Var(0)), Appl(Var(1), Var(0)))))),
+  Comb.K: Func(Func(Var(1))),
+  Comb.I: Func(Var(0)),
+  Comb.B: Func(Func(Func(Appl(Var(2), Appl(Var(1), Var(0)))))),
+  Comb.C: Func(Func(Func(Appl(Appl(Var(2), Var(0)), Var(1))))),
+}
+
+def _top(term: Term) -> int:
+  if isinstance(term, Ap): return term.top
+  if isinstance(term, int): return term
+  return _NONE
+##
+
+def _abstract(term: Term, level: int) -> Term:
+  done: dict[int, Term] = {}
+  todo: list[tuple[Term, bool]] = [(term, False)]
+  while todo:
+    node, ready = todo.pop()
+    if id(node) in done: continue
+    if _top(node) < level:
+      done[id(node)] = Ap(Comb.K, node)
+    elif not isinstance(node, Ap):
+      done[id(node)] = Comb.I
+    elif not ready:
+      todo.append((node, True))
+      todo.append((node.arg, False))
+      todo.append((node.func, False))
+    elif _top(node.func) < level:
+      done[id(node)] = node.func if node.arg == level else Ap(Ap(Comb.B, node.func), done[id(node.arg)])
+    elif _top(node.arg) < level:
+      done[id(node)] = Ap(Ap(Comb.C, done[id(node.func)]), node.arg)
+    else:
+      done[id(node)] = Ap(Ap(Comb.S, done[id(node.func)]), done[id(node.arg)])
+    ##
+  ##
+  return done[id(term)]
+##
+
+def to_combinators(expr: Expr) -> Term:
+  done: dict[tuple[Expr, int], Term] = {}
+  todo: list[tuple[Expr, int, bool]] = [(expr, 0, False)]
+  while todo:
+    node, depth, ready = todo.pop()
+    key = (node, depth)
+    if key in done: continue
+    if isinstance(node, Var):
+      done[key] = depth - 1 - node.index
+    elif not ready:
+      todo.append((node, depth, True))
+      if isinstance(node, Func):
+        todo.append((node.body, depth + 1, False))
+      else:
+        todo.append((node.arg, depth, False))
+        todo.append((node.func, depth, False))
+      ##
+    elif isinstance(node, Func):
+      done[key] = _abstract(done[node.body, depth + 1], depth)
+    else:
+      done[key] = Ap(done[node.func, depth], done[node.arg, depth])
+    ##
+  ##
+  return done[expr, 0]
+##
+
+def to_expr(term: Term) -> Expr:
+  done: dict[int, Expr] = {}
+  todo: list[tuple[Term, bool]] = [(term, False)]
+  while todo:
+    node, ready = todo.pop()
+    if id(node) in done: continue
+    if isinstance(node, Comb):
+      done[id(node)] = _DEFINITIONS[node]
+    elif isinstance(node, int):
+      done[id(node)] = Var(-node - 1)
+    elif not ready:
+      todo.append((node, True))
+      todo.append((node.arg, False))
+      todo.append((node.func, False))
+    else:
+      done[id(node)] = Appl(done[id(node.func)], done[id(node.arg)])
+    ##
+  ##
+  return done[id(term)]
+##
+
+_AP = 0
+_COMB = 1
+_REF = 2
+_IND = 3
+
+class _Node:
+  __slots__ = ('kind', 'a', 'b')
+
+  def __init__(self, kind: int, a: object, b: _Node | None = None) -> None:
+    self.kind = kind
+    self.a = a
+    self.b = b
+  ##
+##
+
+def _graph(term: Term) -> _Node:
+  done: dict[int, _Node] = {}
+  todo: list[tuple[Term, bool]] = [(term, False)]
+  while todo:
+    node, ready = todo.pop()
+    if id(node) in done: continue
+    if isinstance(node, Comb):
+      done[id(node)] = _Node(_COMB, node)
+    elif isinstance(node, int):
+      done[id(node)] = _Node(_REF, node)
+    elif not ready:
+      todo.append((node, True))
+      todo.append((node.arg, False))
+      todo.append((node.func, False))
+    else:
+      done[id(node)] = _Node(_AP, done[id(node.func)], done[id(node.arg)])
+    ##
+  ##
+  return done[id(term)]
+##
+
+def _whnf(node: _Node) -> tuple[_Node, list[_Node]]:
+  spine: list[_Node] = []
+  while True:
+    while node.kind == _IND:
+      node = node.a
+    ##
+    if node.kind == _AP:
+      spine.append(node)
+      node = node.a
+      continue
+    ##
+    if node.kind == _REF: return node, spine
+    comb = node.a
+    n = _ARITY[comb]
+    if len(spine) < n: return node, spine
+    root = spine[-n]
+    x = spine[-1].b
+    if comb is Comb.I:
+      root.kind, root.a, root.b = _IND, x, None
+    elif comb is Comb.K:
+      root.kind, root.a, root.b = _IND, x, None
+    else:
+      f, g, x = x, spine[-2].b, spine[-3].b
+      if comb is Comb.S:
+        root.a, root.b = _Node(_AP, f, x), _Node(_AP, g, x)
+      elif comb is Comb.B:
+        root.a, root.b = f, _Node(_AP, g, x)
+      else:
+        root.a, root.b = _Node(_AP, f, x), g
+      ##
+      root.kind = _AP
+    ##
+    del spine[len(spine) - n:]
+    node = root
+  ##
+##
+
+def normalize(expr: Expr) -> Expr:
+  out: list[Expr] = []
+  todo: list[tuple[_Node | None, int]] = [(_graph(to_combinators(expr)), 0)]
+  while todo:
+    node, depth = todo.pop()
+    if node is None:
+      if depth < 0:
+        out.append(eta_func(out.pop()))
+      else:
+        args = out[len(out) - depth:]
+        del out[len(out) - depth:]
+        head = out.pop()
+        for arg in args:
+          head = Appl(head, arg)
+        ##
+        out.append(head)
+      ##
+      continue
+    ##
+    head, spine = _whnf(node)
+    if head.kind == _COMB:
+      todo.append((None, -1))
+      todo.append((_Node(_AP, node, _Node(_REF, depth)), depth + 1))
+      continue
+    ##
+    out.append(Var(depth - 1 - head.a))
+    todo.append((None, len(spine)))
+    todo.extend((app.b, depth) for app in spine)
+  ##
+  return out[0]
+##
@@ -0,0 +1,327 @@
+import struct
+import sys
+from array import array
+from collections.abc import Callable
+from mockingbird.ast import Appl, Expr, Func, Var
+
+_VAR = 0
+_FUNC = 1
+_APPL = 2
+
+_MAGIC = b'MBST'
+_HEADER = struct.Struct('<4sBQ')
+_TYPECODES = {array(code).itemsize: code for code in 'qlih'}
+
+type _Path = tuple[int, int, _Path] | None
+
+class Store:
+  __slots__ = ('tags', 'left', 'right', 'max_free')
+
+  def __init__(self) -> None:
+    self.tags = array('B')
+    self.left = array('i')
+    self.right = array('i')
+    self.max_free = array('i')
+  ##
+
+  def __len__(self) -> int:
+    return len(self.tags)
+  ##
+
+  def _push(self, tag: int, left: int, right: int, max_free: int) -> int:
+    self.tags.append(tag)
+    self.left.append(left)
+    self.right.append(right)
+    self.max_free.append(max_free)
+    return len(self.tags) - 1
+  ##
+
+  def var(self, index: int) -> int:
+    return self._push(_VAR, index, -1, index)
+  ##
+
+  def func(self, body: int) -> int:
+    return self._push(_FUNC, body, -1, max(self.max_free[body] - 1, -1))
+  ##
+
+  def appl(self, func: int, arg: int) -> int:
+    return self._push(_APPL, func, arg, max(self.max_free[func], self.max_free[arg]))
+  ##
+
+  def add(self, expr: Expr) -> int:
+    done: dict[Expr, int] = {}
+    todo: list[Expr] = [expr]
+    while todo:
+      node = todo[-1]
+      if node in done:
+        todo.pop()
+      elif isinstance(node, Var):
+        done[node] = self.var(node.index)
+        todo.pop()
+      elif isinstance(node, Func):
+        if node.body in done:
+          done[node] = self.func(done[node.body])
+          todo.pop()
+        else:
+          todo.append(node.body)
+        ##
+      else:
+        pending = [child for child in (node.arg, node.func) if child not in done]
+        if pending:
+          todo.extend(pending)
+        else:
+          done[node] = self.appl(done[node.func], done[node.arg])
+          todo.pop()
+        ##
+      ##
+    ##
+    return done[expr]
+  ##
+
+  def expr(self, root: int) -> Expr:
+    tags, left, right = self.tags, self.left, self.right
+    done: dict[int, Expr] = {}
+    todo: list[int] = [root]
+    while todo:
+      node = todo[-1]
+      if node in done:
+        todo.pop()
+        continue
+      ##
+      tag = tags[node]
+      if tag == _VAR:
+        done[node] = Var(left[node])
+      elif tag == _FUNC:
+        if left[node] not in done:
+          todo.append(left[node])
+          continue
+        ##
+        done[node] = Func(done[left[node]])
+      else:
+        pending = [child for child in (right[node], left[node]) if child not in done]
+        if pending:
+          todo.extend(pending)
+          continue
+        ##
+        done[node] = Appl(done[left[node]], done[right[node]])
+      ##
+      todo.pop()
+    ##
+    return done[root]
+  ##
+
+  def _rewrite(self, root: int, base: int, d: int, replacement: int | None) -> int:
+    if replacement is None and d == 0: return root
+    tags, left, right, max_free = self.tags, self.left, self.right, self.max_free
+    shifted: dict[int, int] = {}
+    done: dict[tuple[int, int], int] = {}
+    todo: list[tuple[int, int]] = [(root, base)]
+    out: list[int] = []
+    while todo:
+      node, depth = todo.pop()
+      if depth < 0:
+        depth = ~depth
+        if tags[node] == _FUNC:
+          result = self.func(out.pop())
+        else:
+          arg = out.pop()
+          result = self.appl(out.pop(), arg)
+        ##
+        done[node, depth] = result
+        out.append(result)
+      elif max_free[node] < depth:
+        out.append(node)
+      elif tags[node] == _VAR:
+        if replacement is not None and left[node] == depth:
+          result = shifted.get(depth)
+          if result is None:
+            result = shifted[depth] = self.shift(replacement, depth - base)
+          ##
+          out.append(result)
+        elif d == 0:
+          out.append(node)
+        else:
+          out.append(self.var(left[node] + d))
+        ##
+      elif (result := done.get((node, depth))) is not None:
+        out.append(result)
+      else:
+        todo.append((node, ~depth))
+        if tags[node] == _FUNC:
+          todo.append((left[node], depth + 1))
+        else:
+          todo.append((right[node], depth))
+          todo.append((left[node], depth))
+        ##
+      ##
+    ##
+    return out[0]
+  ##
+
+  def shift(self, node: int, d: int, cutoff: int = 0) -> int:
+    return self._rewrite(node, cutoff, d, None)
+  ##
+
+  def substitute(self, node: int, index: int, replacement: int) -> int:
+    return self._rewrite(node, index, 0, replacement)
+  ##
+
+  def beta_reduce(self, body: int, arg: int) -> int:
+    return self._rewrite(body, 0, -1, arg)
+  ##
+
+  def _beta_redex(self, node: int) -> int | None:
+    if self.tags[node] == _APPL and self.tags[self.left[node]] == _FUNC:
+      return self.beta_reduce(self.left[self.left[node]], self.right[node])
+    ##
+    return None
+  ##
+
+  def _eta_redex(self, node: int) -> int | None:
+    if self.tags[node] != _FUNC: return None
+    body = self.left[node]
+    if self.tags[body] != _APPL: return None
+    func, arg = self.left[body], self.right[body]
+    if self.tags[arg] != _VAR or self.left[arg] != 0 or self.is_free(func, 0): return None
+    return self.shift(func, -1)
+  ##
+
+  def _find_step(self, root: int, contract: Callable[[int], int | None]) -> int | None:
+    tags, left, right = self.tags, self.left, self.right
+    seen: set[int] = set()
+    todo: list[tuple[int, _Path]] = [(root, None)]
+    while todo:
+      node, path = todo.pop()
+      if node in seen: continue
+      seen.add(node)
+      result = contract(node)
+      if result is not None:
+        while path is not None:
+          parent, side, path = path
+          if tags[parent] == _FUNC: result = self.func(result)
+          elif side: result = self.appl(left[parent], result)
+          else: result = self.appl(result, right[parent])
+        ##
+        return result
+      ##
+      if tags[node] == _FUNC:
+        todo.append((left[node], (node, 0, path)))
+      elif tags[node] == _APPL:
+        todo.append((right[node], (node, 1, path)))
+        todo.append((left[node], (node, 0, path)))
+      ##
+    ##
+    return None
+  ##
+
+  def is_free(self, root: int, index: int) -> bool:
+    tags, left, right, max_free = self.tags, self.left, self.right, self.max_free
+    seen: set[tuple[int, int]] = set()
+    todo: list[tuple[int, int]] = [(root, index)]
+    while todo:
+      node, index = todo.pop()
+      if index > max_free[node] or (node, index) in seen: continue
+      if index == max_free[node]: return True
+      seen.add((node, index))
+      if tags[node] == _FUNC:
+        todo.append((left[node], index + 1))
+      elif tags[node] == _APPL:
+        todo.append((right[node], index))
+        todo.append((left[node], index))
+      ##
+    ##
+    return False
+  ##
+
+  def beta_step(self, node: int) -> int | None:
+    return self._find_step(node, self._beta_redex)
+  ##
+
+  def eta_step(self, node: int) -> int | None:
+    return self._find_step(node, self._eta_redex)
+  ##
+
+  def step(self, node: int) -> int | None:
+    result = self.beta_step(node)
+    if result is None: result = self.eta_step(node)
+    return result
+  ##
+
+  def extract(self, roots: list[int]) -> tuple[Store, list[int]]:
+    tags, left, right = self.tags, self.left, self.right
+    store = Store()
+    done: dict[int, int] = {}
+    todo: list[int] = list(reversed(roots))
+    while todo:
+      node = todo[-1]
+      if node in done:
+        todo.pop()
+        continue
+      ##
+      tag = tags[node]
+      if tag == _VAR:
+        done[node] = store.var(left[node])
+      elif tag == _FUNC:
+        if left[node] not in done:
+          todo.append(left[node])
+          continue
+        ##
+        done[node] = store.func(done[left[node]])
+      else:
+        pending = [child for child in (right[node], left[node]) if child not in done]
+        if pending:
+          todo.extend(pending)
+          continue
+        ##
+        done[node] = store.appl(done[left[node]], done[right[node]])
+      ##
+      todo.pop()
+    ##
+    return store, [done[root] for root in roots]
+  ##
+
+  def tobytes(self) -> bytes:
+    arrays = [self.left, self.right, self.max_free]
+    if sys.byteorder == 'big':
+      arrays = [array(a.typecode, a) for a in arrays]
+      for a in arrays:
+        a.byteswap()
+      ##
+    ##
+    return b''.join([_HEADER.pack(_MAGIC, self.left.itemsize, len(self)), self.tags.tobytes(), *(a.tobytes() for a in arrays)])
+  ##
+
+  @classmethod
+  def frombytes(cls, data: bytes) -> Store:
+    if len(data) < _HEADER.size:
+      raise ValueError("truncated term store")
+    ##
+    magic, itemsize, count = _HEADER.unpack_from(data)
+    if magic != _MAGIC:
+      raise ValueError("not a term store")
+    ##
+    if itemsize not in _TYPECODES:
+      raise ValueError(f"unsupported index width {itemsize}")
+    ##
+    store = cls()
+    width = itemsize * count
+    if len(data) != _HEADER.size + count + 3 * width:
+      raise ValueError("truncated term store")
+    ##
+    view = memoryview(data)[_HEADER.size:]
+    store.tags.frombytes(view[:count])
+    view = view[count:]
+    for a in (store.left, store.right, store.max_free):
+      chunk = a if itemsize == a.itemsize else array(_TYPECODES[itemsize])
+      chunk.frombytes(view[:width])
+      if sys.byteorder == 'big': chunk.byteswap()
+      if chunk is not a: a.fromlist(chunk.tolist())
+      view = view[width:]
+    ##
+    return store
+  ##
+
+  def __reduce__(self) -> tuple[Callable[[bytes], Store], tuple[bytes]]:
+    return (Store.frombytes, (self.tobytes(),))
+  ##
+##
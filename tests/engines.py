@@ -0,0 +1,73 @@
+from collections.abc import Callable
+from mockingbird.ast import Appl, Expr, Func, Var, step
+from mockingbird.church import ADD, EXP, MUL, PRED, TRUE, numeral
+from mockingbird.parser import parse
+
+S = parse(r"λ λ λ 2 0 (1 0)")
+K = TRUE
+TWO = numeral(2)
+THREE = numeral(3)
+OMEGA = parse(r"(λ 0 0) (λ 0 0)")
+
+def apply(head: Expr, *args: Expr) -> Expr:
+  for arg in args:
+    head = Appl(head, arg)
+  ##
+  return head
+##
+
+def step_normal_form(expr: Expr) -> Expr:
+  while (result := step(expr)) is not None:
+    expr = result
+  ##
+  return expr
+##
+
+TERMS = [
+  Var(0),
+  parse("3 1 2"),
+  parse(r"λ 0"),
+  apply(S, K, K),
+  apply(S, K, K, Var(7)),
+  apply(TWO, Var(0), Var(1)),
+  apply(ADD, TWO, THREE),
+  apply(MUL, TWO, THREE, Var(5)),
+  apply(EXP, TWO, THREE),
+  apply(PRED, THREE),
+  apply(TWO, TWO, TWO),
+  parse(r"λ (λ 0) 0"),
+  parse(r"λ λ 2 0"),
+  parse(r"λ λ 1 (λ 1 0)"),
+  parse(r"λ λ 3 (λ 1 4)"),
+  parse(r"0 (λ 1 0) ((λ 0) 2)"),
+  parse(r"(λ 0 0) ((λ 0) (λ 0))"),
+  parse(r"(λ 0 (0 1)) (λ 2 0)"),
+  parse(r"λ (λ λ 1 2) (λ 1 0)"),
+  parse(r"λ λ (λ λ 3 1 0) 1 4"),
+]
+
+# terms whose normal form is only reached by never reducing the Ω argument
+LAZY_TERMS = [
+  apply(K, Var(0), OMEGA),
+  parse(r"λ (λ 1) ((λ 0 0) (λ 0 0))"),
+]
+
+def assert_matches_step_loop(normalize: Callable[[Expr], Expr], terms: list[Expr] = TERMS + LAZY_TERMS) -> None:
+  for expr in terms:
+    assert normalize(expr) == step_normal_form(expr), str(expr)
+  ##
+##
+
+def assert_normalizes_deep_numeral(normalize: Callable[[Expr], Expr]) -> None:
+  assert normalize(apply(numeral(20_000), Var(0), Var(1))).size == 40_001
+##
+
+def assert_shares_arguments(normalize: Callable[[Expr], Expr]) -> None:
+  # T(0) = (λ 0) (λ 0), T(k+1) = (λ 0 0) T(k): normal order takes about 2^k
+  # steps because every copy of T(k) is reduced again; with sharing it is linear.
+  expr = parse(r"(λ 0) (λ 0)")
+  for _ in range(60):
+    expr = Appl(Func(Appl(Var(0), Var(0))), expr)
+  ##
+  assert normalize(expr) == parse(r"λ 0")
+##
@@ -1,4 +1,9 @@
-from mockingbird.ast import Appl, Func, Var, step
+import copy
+import gc
+import pickle
+import threading
+from mockingbird.ast import Appl, Expr, Func, Var, beta_reduce, hash_context, interned, plug_hash, step
+from mockingbird.parser import parse
 
 def test_var():
   assert str(Var(0)) == "0"
@@ -302,6 +307,14 @@ def test_step_falls_back_to_eta():
   assert step(expr) == Var(0)
 ##
 
+def test_step_prefers_later_beta_over_earlier_eta():
+  # 0 (λ 1 0) ((λ 0) 2) — the η-redex comes first, the β-redex is in the last argument
+  eta = Func(Appl(Var(1), Var(0)))
+  expr = Appl(Appl(Var(0), eta), Appl(Func(Var(0)), Var(2)))
+  assert step(expr) == Appl(Appl(Var(0), eta), Var(2))
+  assert step(step(expr)) == Appl(Appl(Var(0), Var(0)), Var(2))
+##
+
 def test_step_irreducible():
   assert step(Var(0)) is None
   assert step(Appl(Var(0), Var(1))) is None
@@ -350,3 +363,254 @@ def test_church_numeral_application():
   # Should be f (f x) = 0 (0 1)
   assert expr == Appl(Var(0), Appl(Var(0), Var(1)))
 ##
+
+# --- interning tests ---
+
+def test_equal_terms_are_identical():
+  assert Var(3) is Var(3)
+  assert Func(Appl(Var(0), Var(0))) is Func(Appl(Var(0), Var(0)))
+  assert parse("λ (λ 1 (0 0)) (λ 1 (0 0))") is parse("λ (λ 1 (0 0)) (λ 1 (0 0))")
+##
+
+def test_self_similar_term_is_a_dag():
+  # Y = λ (λ 1 (0 0)) (λ 1 (0 0)) — both halves are the same node
+  y = parse("λ (λ 1 (0 0)) (λ 1 (0 0))")
+  assert isinstance(y, Func) and isinstance(y.body, Appl)
+  assert y.body.func is y.body.arg
+##
+
+def test_reduction_results_are_interned():
+  k = Func(Func(Var(1)))
+  assert Appl(k, Var(0)).beta_step() is Func(Var(1))
+  assert Func(Appl(Var(1), Var(0))).eta_step() is Var(0)
+  assert Func(Var(1)).shift(1) is Func(Var(2))
+  assert Appl(Var(0), Var(1)).substitute(0, Var(5)) is Appl(Var(5), Var(1))
+##
+
+def test_unreferenced_terms_are_collected():
+  gc.collect()
+  before = interned()
+  expr = Func(Appl(Var(1000), Appl(Var(1001), Var(1002))))
+  assert interned() == before + 6
+  del expr
+  gc.collect()
+  assert interned() == before
+##
+
+def test_concurrent_interning():
+  barrier = threading.Barrier(8)
+  results: list[list[Expr]] = [[] for _ in range(8)]
+  def build(out: list[Expr]) -> None:
+    barrier.wait()
+    out.extend(Appl(Var(i % 97), Func(Var(i))) for i in range(20_000))
+  ##
+  threads = [threading.Thread(target=build, args=(out,)) for out in results]
+  for thread in threads:
+    thread.start()
+  ##
+  for thread in threads:
+    thread.join()
+  ##
+  first = results[0]
+  for out in results[1:]:
+    assert all(a is b for a, b in zip(first, out, strict=True))
+  ##
+  assert len({id(expr) for expr in first}) == 20_000
+  assert first[5] == Appl(Var(5), Func(Var(5)))
+##
+
+def test_copy_and_pickle_preserve_identity():
+  expr = parse("λ (λ 1 (0 0)) (λ 1 (0 0))")
+  assert copy.copy(expr) is expr
+  assert copy.deepcopy(expr) is expr
+  assert pickle.loads(pickle.dumps(expr)) is expr
+##
+
+def test_pickle_deep_terms_without_recursion():
+  body: Expr = Var(0)
+  for _ in range(100_000):
+    body = Appl(Var(1), body)
+  ##
+  expr = Func(Func(body))
+  for protocol in range(pickle.HIGHEST_PROTOCOL + 1):
+    assert pickle.loads(pickle.dumps(expr, protocol)) is expr
+  ##
+  assert copy.deepcopy([expr, expr])[0] is expr
+##
+
+def test_pickled_terms_are_little_endian():
+  # λ 0 (1 0) is written as the same bytes on every host
+  data = Func(Appl(Var(0), Appl(Var(1), Var(0)))).__reduce__()[1][0]
+  codes = [int.from_bytes(data[i:i + 8], "little", signed=True) for i in range(0, len(data), 8)]
+  assert codes == [1, ~1, ~0, 1, ~0, 0, 0, 1]
+##
+
+def test_pickle_keeps_shared_subterms_shared():
+  # a 2^40-node tree that is only 41 distinct nodes
+  tree: Expr = Func(Var(3))
+  for _ in range(40):
+    tree = Appl(tree, tree)
+  ##
+  data = pickle.dumps(tree)
+  assert len(data) < 2000
+  assert pickle.loads(data) is tree
+##
+
+# --- metadata tests ---
+
+def test_size_and_depth():
+  assert (Var(7).size, Var(7).depth) == (1, 1)
+  y = parse("λ (λ 1 (0 0)) (λ 1 (0 0))")
+  assert y.size == 14
+  assert y.depth == 6
+##
+
+def test_max_free():
+  assert Var(3).max_free == 3
+  assert Func(Var(0)).max_free == -1
+  assert Func(Func(Var(1))).max_free == -1
+  assert Func(Appl(Var(2), Var(0))).max_free == 1
+  assert Appl(Var(4), Func(Var(0))).max_free == 4
+##
+
+def test_shift_and_substitute_keep_untouched_subterms():
+  k = Func(Func(Var(1)))
+  assert k.shift(5) is k
+  assert k.substitute(0, Var(9)) is k
+  expr = Appl(k, Var(2))
+  assert expr.shift(1, cutoff=3) is expr
+  assert expr.substitute(1, Var(9)) is expr
+  assert expr.shift(1).func is k
+##
+
+def test_is_free_at_max_free():
+  assert Func(Appl(Var(3), Var(0))).is_free(2) is True
+  assert Func(Appl(Var(3), Var(0))).is_free(3) is False
+  assert Func(Appl(Var(3), Var(1))).is_free(1) is False
+##
+
+# --- beta_reduce tests ---
+
+def test_beta_reduce_matches_substitute_then_shift():
+  bodies = ["0", "1", "2 0 1", "λ 1 (λ 2 0 3)", "λ λ 2 (1 0) (λ 3 4)", "0 (λ 1 (λ 2 3))"]
+  args = ["0", "3", "λ 0", "λ 1 2", "0 (λ 1)"]
+  for body_text in bodies:
+    for arg_text in args:
+      body, arg = parse(body_text), parse(arg_text)
+      assert beta_reduce(body, arg) == body.substitute(0, arg.shift(1)).shift(-1), (body_text, arg_text)
+    ##
+  ##
+##
+
+def test_beta_reduce_keeps_closed_subterms():
+  k = Func(Func(Var(1)))
+  body = Appl(Appl(Var(0), k), Func(Var(1)))
+  result = beta_reduce(body, Var(4))
+  assert result == Appl(Appl(Var(4), k), Func(Var(5)))
+  assert isinstance(result, Appl) and isinstance(result.func, Appl)
+  assert result.func.arg is k
+##
+
+# --- deep term tests ---
+
+DEPTH = 20_000
+
+def _deep_numeral(n: int) -> Func:
+  # λ λ 1 (1 (1 ... 0))
+  body = Var(0)
+  for _ in range(n):
+    body = Appl(Var(1), body)
+  ##
+  return Func(Func(body))
+##
+
+def _deep_spine(n: int) -> Appl:
+  # 0 1 1 ... 1 — a left-nested application spine
+  expr = Appl(Var(0), Var(1))
+  for _ in range(n - 1):
+    expr = Appl(expr, Var(1))
+  ##
+  return expr
+##
+
+def test_deep_str_and_repr():
+  numeral = _deep_numeral(DEPTH)
+  text = str(numeral)
+  assert text.startswith("λ λ 1 (1 (1 ")
+  assert text.endswith(" 0" + ")" * (DEPTH - 1))
+  assert repr(numeral).startswith("Func(body=Func(body=Appl(func=Var(index=1), arg=Appl(")
+  assert str(_deep_spine(DEPTH)) == "0" + " 1" * DEPTH
+##
+
+def test_deep_shift_and_substitute():
+  numeral = _deep_numeral(DEPTH)
+  assert numeral.shift(3) is numeral
+  assert numeral.body.shift(1) == Func(_deep_numeral(DEPTH).body.body.shift(1, cutoff=1))
+  spine = _deep_spine(DEPTH)
+  shifted = spine.shift(2)
+  assert shifted.size == spine.size
+  assert shifted.max_free == 3
+  assert spine.substitute(1, Var(5)).substitute(5, Var(1)) is spine
+##
+
+def test_deep_is_free():
+  numeral = _deep_numeral(DEPTH)
+  assert numeral.body.body.is_free(0)
+  assert not numeral.is_free(0)
+  assert _deep_spine(DEPTH).is_free(0)
+##
+
+def test_deep_beta_and_eta_steps():
+  numeral = _deep_numeral(DEPTH)
+  applied = Appl(Appl(numeral, Var(7)), Var(8))
+  first = step(applied)
+  assert first is not None
+  second = step(first)
+  assert second is not None
+  assert second.size == 2 * DEPTH + 1
+  assert step(second) is None
+  expanded = Func(Appl(_deep_spine(DEPTH).shift(1), Var(0)))
+  assert expanded.eta_step() is _deep_spine(DEPTH)
+##
+
+# --- hash tests ---
+
+def _all_terms(size: int, free: int) -> list[Expr]:
+  if size == 1: return [Var(i) for i in range(free)]
+  result = [Func(body) for body in _all_terms(size - 1, free + 1)]
+  for left in range(1, size - 1):
+    for func in _all_terms(left, free):
+      for arg in _all_terms(size - 1 - left, free):
+        result.append(Appl(func, arg))
+      ##
+    ##
+  ##
+  return result
+##
+
+def test_hashes_are_structural():
+  expr = parse("λ 0 1 (2 3)")
+  expected = hash(expr)
+  del expr
+  gc.collect()
+  assert hash(parse("λ 0 1 (2 3)")) == expected
+##
+
+def test_no_hash_collisions_among_small_terms():
+  hashes: dict[int, Expr] = {}
+  for size in range(1, 8):
+    for expr in _all_terms(size, 3):
+      assert hashes.setdefault(hash(expr), expr) is expr
+    ##
+  ##
+##
+
+def test_swapped_leaves_hash_differently():
+  assert hash(parse("0 1 (2 3)")) != hash(parse("0 2 (1 3)"))
+##
+
+def test_hash_contexts_predict_plugged_hashes():
+  hole = parse("1 (λ 0 2)")
+  context = hash_context(hash_context(hash_context((1, 0), None, 0), parse("3 0"), 1), parse("λ 0"), 0)
+  assert plug_hash(context, hole) == hash(Func(Appl(parse("3 0"), Appl(hole, parse("λ 0")))))
+##
@@ -0,0 +1,88 @@
+from io import BytesIO
+import pytest
+from mockingbird.ast import Appl, Expr, Var
+from mockingbird.blc import decode, dump, encode, load
+from mockingbird.church import numeral
+from mockingbird.parser import parse
+
+TERMS = [
+  "0",
+  "7",
+  "λ 0",
+  "λ λ 1",
+  "λ λ 1 (1 0)",
+  "λ λ λ 2 0 (1 0)",
+  "(λ 0 0) (λ 0 0)",
+  "0 (λ 1 0) ((λ 0) 2)",
+  "λ 3 (λ 5 0 1)",
+]
+
+def test_round_trip():
+  for text in TERMS:
+    expr = parse(text)
+    assert decode(encode(expr)) == expr, text
+    assert decode(encode(expr, shared=True), shared=True) == expr, text
+  ##
+##
+
+def test_tromp_codes():
+  # λ 0 is 00 10, padded to a byte
+  assert encode(parse("λ 0")) == bytes([0b00100000])
+  # K = λ λ 1 is 00 00 110
+  assert encode(parse("λ λ 1")) == bytes([0b00001100])
+  # S = λ λ λ 2 0 (1 0) is 00 00 00 01 01 1110 10 01 110 10
+  assert encode(parse("λ λ λ 2 0 (1 0)")) == bytes([0b00000001, 0b01111010, 0b01110100])
+##
+
+def test_shared_subterms_are_referenced():
+  expr = Appl(numeral(200), numeral(200))
+  assert len(encode(expr, shared=True)) < len(encode(numeral(200), shared=True)) + 4
+  tree: Expr = Var(0)
+  for _ in range(40):
+    tree = Appl(tree, tree)
+  ##
+  assert len(encode(tree, shared=True)) < 100
+  assert decode(encode(tree, shared=True), shared=True) is tree
+##
+
+def test_deep_terms_do_not_recurse():
+  expr = numeral(50_000)
+  assert decode(encode(expr)) is expr
+  assert decode(encode(expr, shared=True), shared=True) is expr
+##
+
+def test_malformed_input():
+  with pytest.raises(ValueError):
+    decode(b"")
+  ##
+  with pytest.raises(ValueError):
+    decode(bytes([0b00000000]))
+  ##
+  with pytest.raises(ValueError):
+    decode(encode(parse("λ 0")) + b"\x00")
+  ##
+  with pytest.raises(ValueError):
+    decode(bytes([0b10100000]), shared=True)
+  ##
+##
+
+def test_framed_file():
+  exprs = [parse(text) for text in TERMS]
+  for shared in (False, True):
+    buffer = BytesIO()
+    assert dump(exprs, buffer, shared) == len(exprs)
+    buffer.seek(0)
+    assert list(load(buffer)) == exprs
+  ##
+##
+
+def test_framed_file_rejects_bad_input():
+  with pytest.raises(ValueError):
+    list(load(BytesIO(b"MBST\x00")))
+  ##
+  buffer = BytesIO()
+  dump([parse("λ λ 1 (1 0)")], buffer)
+  with pytest.raises(ValueError):
+    list(load(BytesIO(buffer.getvalue()[:-1])))
+  ##
+##
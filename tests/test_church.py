@@ -0,0 +1,142 @@
+import pytest
+from mockingbird.ast import Appl, Expr, Func, Var
+from mockingbird.church import (
+    ADD, AND, EXP, FALSE, ISZERO, MUL, NOT, OR, PRED, SUCC, TRUE, accelerate, boolean, church_list, decode, encode,
+    numeral, pair, scott_list, to_bool, to_int, to_list, to_pair, to_scott_list,
+)
+from mockingbird.parser import parse
+from mockingbird.reduction import Strategy, normalize
+
+def _apply(head: Expr, *args: Expr) -> Expr:
+  for arg in args:
+    head = Appl(head, arg)
+  ##
+  return head
+##
+
+def test_numerals_round_trip():
+  for n in range(20):
+    assert to_int(numeral(n)) == n
+  ##
+  assert numeral(2) == parse(r"λ λ 1 (1 0)")
+  assert to_int(parse(r"λ 0")) == 1
+  assert to_int(parse(r"λ λ 0 (0 1)")) is None
+  assert to_int(Var(0)) is None
+##
+
+def test_booleans_round_trip():
+  assert to_bool(boolean(True)) is True
+  assert to_bool(boolean(False)) is False
+  assert to_bool(numeral(2)) is None
+##
+
+def test_accelerated_arithmetic_matches_reduction():
+  ops = [(SUCC, 1), (PRED, 1), (ISZERO, 1), (ADD, 2), (MUL, 2), (EXP, 2)]
+  for op, arity in ops:
+    for m in range(4):
+      for n in range(4):
+        expr = _apply(op, *[numeral(m), numeral(n)][:arity])
+        assert accelerate(expr) != expr
+        assert normalize(accelerate(expr)).expr == normalize(expr).expr, (op, m, n)
+      ##
+    ##
+  ##
+##
+
+def test_accelerated_logic_matches_reduction():
+  for op, arity in [(NOT, 1), (AND, 2), (OR, 2)]:
+    for p in (TRUE, FALSE):
+      for q in (TRUE, FALSE):
+        expr = _apply(op, *[p, q][:arity])
+        assert normalize(expr, accelerate=True).expr == normalize(expr).expr
+      ##
+    ##
+  ##
+##
+
+def test_nested_arithmetic_is_folded_once():
+  # (2 + 3) * pred 4, under a lambda and applied to a free variable
+  expr = Func(Appl(Var(0), _apply(MUL, _apply(ADD, numeral(2), numeral(3)), Appl(PRED, numeral(4)))))
+  assert accelerate(expr) == Func(Appl(Var(0), numeral(15)))
+  result = normalize(expr, accelerate=True)
+  assert result.expr == normalize(expr).expr
+  assert result.steps == 0
+##
+
+def test_partial_applications_are_left_alone():
+  expr = Appl(ADD, numeral(2))
+  assert accelerate(expr) is expr
+  assert accelerate(Appl(ADD, Var(0))) is Appl(ADD, Var(0))
+  assert accelerate(_apply(SUCC, numeral(1), Var(7))) == Appl(numeral(2), Var(7))
+##
+
+def test_large_results_are_not_materialized():
+  # normal order discards the argument of K, so 10^6 must never be written out
+  big = _apply(EXP, numeral(10), numeral(6))
+  assert accelerate(big) is big
+  assert accelerate(_apply(EXP, numeral(10), _apply(ADD, numeral(3), numeral(3)))) == big
+  assert normalize(_apply(TRUE, Var(0), big), accelerate=True).expr == Var(0)
+  # 3^(10^8) is never even computed: it is far beyond what folding will evaluate
+  huge = _apply(EXP, numeral(3), _apply(EXP, numeral(10), numeral(8)))
+  assert accelerate(huge) is huge
+  assert normalize(_apply(TRUE, Var(0), huge), accelerate=True).expr == Var(0)
+  assert normalize(Appl(ISZERO, _apply(EXP, numeral(10), numeral(8))), accelerate=True).expr == FALSE
+##
+
+def test_exponentiation_is_fast():
+  expr = Appl(ISZERO, _apply(EXP, numeral(2), _apply(MUL, numeral(10), numeral(10))))
+  result = normalize(expr, accelerate=True)
+  assert result.expr == FALSE
+  assert to_int(accelerate(_apply(EXP, numeral(3), numeral(7)))) == 3 ** 7
+##
+
+def test_acceleration_needs_a_normalizing_strategy():
+  with pytest.raises(ValueError):
+    normalize(Appl(SUCC, numeral(1)), strategy=Strategy.WEAK_HEAD, accelerate=True)
+  ##
+##
+
+def test_pairs_round_trip():
+  assert to_pair(pair(numeral(2), Var(3))) == (numeral(2), Var(3))
+  assert to_pair(parse(r"λ 0 0 1")) is None
+  assert to_pair(numeral(2)) is None
+##
+
+def test_lists_round_trip():
+  items = [numeral(1), Var(4), TRUE, Func(Var(2))]
+  assert to_list(church_list(items)) == items
+  assert to_scott_list(scott_list(items)) == items
+  assert to_list(church_list([])) == []
+  assert to_scott_list(scott_list([])) == []
+  # an element may not refer to the list's own binders
+  assert to_list(parse(r"λ λ 1 0 0")) is None
+  assert to_scott_list(parse(r"λ λ 0 (λ 0) (λ λ 0 2 (λ λ 1))")) is None
+##
+
+def test_normalized_data_decodes():
+  # map succ over a Church list, then read the result back
+  xs = encode([1, 2, 3])
+  mapped = parse(r"λ λ λ λ 2 (λ λ 3 (5 1) 0) 0")
+  result = normalize(_apply(mapped, SUCC, xs)).expr
+  assert decode(result, [int]) == [2, 3, 4]
+  assert decode(normalize(Appl(Appl(mapped, SUCC), encode([5]))).expr, [int]) == [6]
+  swap = parse(r"λ 0 (λ λ λ 0 1 2)")
+  assert decode(normalize(Appl(swap, encode((True, 7)))).expr, (int, bool)) == (7, True)
+##
+
+def test_encode_decode_nested_values():
+  value = [(1, [True, False]), (0, []), (12, [False])]
+  shape = [(int, [bool])]
+  assert decode(encode(value), shape) == value
+  assert decode(encode(value, scott=True), shape, scott=True) == value
+  with pytest.raises(ValueError):
+    decode(encode(value), [(bool, [bool])])
+  ##
+##
+
+def test_long_data_decodes_without_recursion():
+  value = [i % 7 for i in range(5000)]
+  assert decode(encode(value), [int]) == value
+  assert decode(encode(value, scott=True), [int], scott=True) == value
+  assert decode(numeral(100_000), int) == 100_000
+##
@@ -0,0 +1,57 @@
+import pytest
+from mockingbird.ast import Appl, Expr, Func, Var
+from mockingbird.church import numeral
+from mockingbird.inet import normalize
+from mockingbird.parser import parse
+from tests.engines import TWO, apply, assert_matches_step_loop, step_normal_form
+
+# duplicators of a term applied to its own copy, which only the oracle keeps apart
+SELF_APPLICATIONS = [
+  apply(parse(r"λ 0 0"), TWO),
+  apply(parse(r"λ 0 0 0"), TWO),
+  apply(parse(r"λ 0 0"), apply(parse(r"λ 0 0"), TWO)),
+  apply(parse(r"λ 0 0 0"), TWO, parse(r"λ 0"), Var(5)),
+  parse(r"(λ λ 1 1) (λ 1 0 (2 0 0 2 1))"),
+]
+
+def test_normalize_matches_step_loop():
+  assert_matches_step_loop(normalize)
+  assert_matches_step_loop(normalize, SELF_APPLICATIONS)
+##
+
+def test_abstract_algorithm_matches_step_loop():
+  assert_matches_step_loop(lambda expr: normalize(expr, oracle=False))
+##
+
+def test_abstract_algorithm_shares_redex_families():
+  # the tree reducers need 2^40 steps here
+  expr = apply(numeral(40), numeral(2), Func(Var(0)), Var(0))
+  assert normalize(expr, oracle=False) == Var(0)
+##
+
+def test_abstract_algorithm_rejects_unstratified_terms():
+  with pytest.raises(ValueError):
+    normalize(SELF_APPLICATIONS[-1], oracle=False)
+  ##
+##
+
+def test_free_variables_pass_through_duplication():
+  assert normalize(apply(TWO, parse(r"λ 1 0 0"), Var(1))) == parse(r"0 (0 1 1) (0 1 1)")
+  assert normalize(apply(TWO, parse(r"λ 1 0 0"), Var(1)), oracle=False) == parse(r"0 (0 1 1) (0 1 1)")
+##
+
+def test_nested_copies_of_a_shared_binder():
+  # both copies of λ 1 0 are read back one inside the other; the outer
+  # occurrence must still resolve to the outer copy
+  expr = parse(r"(λ 0 0) (λ 1 (λ 2) (λ 1 0))")
+  assert normalize(expr) == step_normal_form(expr) == parse(r"0 (λ 1) (0 (λ 1))")
+##
+
+def test_level_shifts_do_not_pile_up():
+  # each I leaves a croissant behind; merged, every later λ crosses them in one rewrite
+  expr: Expr = Var(0)
+  for _ in range(3000):
+    expr = Func(Appl(Func(Var(0)), expr))
+  ##
+  assert normalize(expr).size == 3001
+##
@@ -0,0 +1,32 @@
+from mockingbird.ast import Var
+from mockingbird.church import EXP
+from mockingbird.krivine import normalize, whnf
+from mockingbird.parser import parse
+from tests.engines import K, S, THREE, apply, assert_matches_step_loop, assert_normalizes_deep_numeral
+
+def test_normalize_matches_step_loop():
+  assert_matches_step_loop(normalize)
+##
+
+def test_whnf_of_values():
+  assert whnf(parse(r"λ (λ 0) 0")) == parse(r"λ (λ 0) 0")
+  assert whnf(parse(r"0 ((λ 0) 1)")) == parse(r"0 ((λ 0) 1)")
+##
+
+def test_whnf_stops_at_head():
+  # (λ λ 1 0) 5 → λ 6 0; the body is not reduced further
+  assert whnf(parse(r"(λ λ 1 0) 5")) == parse(r"λ 6 0")
+  assert whnf(apply(K, parse(r"(λ 0) 3"))) == parse(r"λ (λ 0) 4")
+  assert whnf(apply(S, K, K, Var(2))) == Var(2)
+  assert whnf(parse(r"(λ 0 ((λ 0) 1)) 4")) == parse(r"4 ((λ 0) 0)")
+##
+
+def test_whnf_substitutes_environment_into_lambda():
+  # (λ λ λ 2 1 0) a b → λ a b 0 with a, b free
+  assert whnf(parse(r"(λ λ λ 2 1 0) 7 8")) == parse(r"λ 8 9 0")
+##
+
+def test_deep_numeral():
+  assert_normalizes_deep_numeral(normalize)
+  assert normalize(apply(EXP, THREE, THREE)).size == 2 * 27 + 3
+##
@@ -0,0 +1,21 @@
+from mockingbird.lazy import normalize
+from mockingbird.parser import parse
+from tests.engines import assert_matches_step_loop, assert_normalizes_deep_numeral, assert_shares_arguments
+
+def test_normalize_matches_step_loop():
+  assert_matches_step_loop(normalize)
+##
+
+def test_shared_arguments_are_reduced_once():
+  assert_shares_arguments(normalize)
+##
+
+def test_shared_open_arguments():
+  # the neutral argument 1 ((λ 0) 2) is evaluated once and read back for every use
+  assert normalize(parse(r"(λ 0 0 0) (1 ((λ 0) 2))")) == parse(r"1 2 (1 2) (1 2)")
+  assert normalize(parse(r"(λ λ 1 (1 0)) (λ 2 ((λ 0) 0))")) == parse(r"λ 2 (2 0)")
+##
+
+def test_deep_numeral():
+  assert_normalizes_deep_numeral(normalize)
+##
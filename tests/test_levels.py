@@ -0,0 +1,34 @@
+from mockingbird.ast import Appl, Expr, Func, Var
+from mockingbird.church import numeral
+from mockingbird.levels import normalize
+from mockingbird.parser import parse
+from tests.engines import K, S, apply, assert_matches_step_loop
+
+def test_normalize_matches_step_loop():
+  assert_matches_step_loop(normalize)
+##
+
+def test_free_variables_keep_their_levels_under_binders():
+  # the argument mentions the outer free variable and is substituted under two binders
+  assert normalize(parse(r"(λ λ λ 0 2) (0 1)")) == parse(r"λ λ 0 (2 3)")
+##
+
+def test_closed_combinator_workload():
+  skk = apply(S, K, K)
+  expr: Expr = Var(0)
+  for _ in range(500):
+    expr = Appl(skk, expr)
+  ##
+  assert normalize(expr) == Var(0)
+  assert normalize(apply(numeral(1000), skk, Var(0))) == Var(0)
+##
+
+def test_deep_terms_do_not_recurse():
+  expr: Expr = Var(0)
+  expected: Expr = Var(0)
+  for _ in range(5000):
+    expr = Func(Appl(Func(Var(0)), expr))
+    expected = Func(expected)
+  ##
+  assert normalize(expr) == expected
+##
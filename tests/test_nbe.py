@@ -0,0 +1,36 @@
+from mockingbird.ast import Appl, Expr, Func, Var
+from mockingbird.nbe import nbe_normalize
+from mockingbird.parser import parse
+from tests.engines import assert_matches_step_loop, assert_normalizes_deep_numeral, assert_shares_arguments
+
+def test_normalize_matches_step_loop():
+  assert_matches_step_loop(nbe_normalize)
+##
+
+def test_closed_arguments_are_evaluated_once():
+  # the closed argument is compiled to a single lazy value shared by every use
+  assert_shares_arguments(nbe_normalize)
+##
+
+def test_open_terms():
+  assert nbe_normalize(parse(r"(λ 0 0 0) (1 ((λ 0) 2))")) == parse(r"1 2 (1 2) (1 2)")
+  assert nbe_normalize(parse(r"λ λ 3 (λ 0 2) 1")) == parse(r"λ λ 3 (λ 0 2) 1")
+##
+
+def test_deep_numeral():
+  assert_normalizes_deep_numeral(nbe_normalize)
+##
+
+def test_deep_evaluation_does_not_recurse():
+  # every I in I (I (… 0)) is only reached by forcing the argument of the one above
+  expr: Expr = Var(0)
+  for _ in range(5000):
+    expr = Appl(Func(Var(0)), expr)
+  ##
+  assert nbe_normalize(expr) == Var(0)
+  expr = Var(0)
+  for _ in range(5000):
+    expr = Func(Appl(Func(Var(0)), expr))
+  ##
+  assert nbe_normalize(expr).size == 5001
+##
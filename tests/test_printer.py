@@ -0,0 +1,64 @@
+from io import StringIO
+from mockingbird.ast import Appl, Expr, Func, Var
+from mockingbird.parser import parse
+from mockingbird.printer import ELLIPSIS, render, write
+
+TERMS = [
+  "0",
+  "12",
+  "λ 0",
+  "λ λ 1 (1 0)",
+  "0 1 2",
+  "0 (1 2)",
+  "(λ 0) 1",
+  "(λ 0 0) (λ 0 0)",
+  "λ λ λ 2 0 (1 0)",
+  "0 (λ 1 0) ((λ 0) 2)",
+  "(λ λ 1) (0 (λ 0)) 3",
+]
+
+def test_unbounded_output_matches_str():
+  for text in TERMS:
+    expr = parse(text)
+    assert render(expr) == str(expr), text
+    assert parse(render(expr)) == expr, text
+  ##
+##
+
+def test_write_streams_into_a_buffer():
+  expr = parse("λ λ 1 (1 0)")
+  out = StringIO()
+  out.write("term: ")
+  assert write(expr, out) == len(str(expr))
+  assert out.getvalue() == "term: " + str(expr)
+##
+
+def test_depth_elision():
+  expr = parse("λ λ 1 (1 (1 0))")
+  assert render(expr, max_depth=3) == f"λ λ 1 ({ELLIPSIS})"
+  assert render(expr, max_depth=0) == ELLIPSIS
+  assert render(parse("(λ 0) (λ 0) 1"), max_depth=2) == f"({ELLIPSIS}) ({ELLIPSIS}) 1"
+  assert render(expr, max_depth=100) == str(expr)
+##
+
+def test_length_limit():
+  expr = parse("λ λ 1 (1 (1 0))")
+  text = str(expr)
+  assert render(expr, max_length=len(text)) == text
+  assert render(expr, max_length=8) == text[:7] + ELLIPSIS
+  assert render(expr, max_length=1) == ELLIPSIS
+  assert render(expr, max_length=0) == ""
+##
+
+def test_huge_terms_print_in_linear_time():
+  body: Expr = Var(0)
+  for _ in range(100_000):
+    body = Appl(Var(1), body)
+  ##
+  expr = Func(Func(body))
+  out = StringIO()
+  write(expr, out)
+  assert out.getvalue() == str(expr)
+  assert render(expr, max_length=20) == "λ λ 1 (1 (1 (1 (1 (" + ELLIPSIS
+  assert render(expr, max_depth=4) == f"λ λ 1 (1 ({ELLIPSIS}))"
+##
@@ -0,0 +1,408 @@
+import pytest
+from mockingbird.ast import Appl, Expr, Func, Var, step
+from mockingbird.church import ADD, EXP, MUL
+from mockingbird.parser import parse
+from mockingbird.reduction import Limit, NormalFormCache, Rule, Stepper, Strategy, normalize, trace
+from tests.engines import K, OMEGA, S, THREE, TWO, apply, step_normal_form
+
+I = parse(r"λ 0")
+
+def _count_steps(expr: Expr) -> int:
+  steps = 0
+  while (expr := step(expr)) is not None:
+    steps += 1
+  ##
+  return steps
+##
+
+TERMS = [
+  Var(0),
+  I,
+  apply(S, K, K),
+  apply(S, K, K, Var(7)),
+  apply(TWO, Var(0), Var(1)),
+  apply(ADD, TWO, THREE),
+  apply(MUL, TWO, THREE),
+  apply(EXP, TWO, THREE),
+  apply(EXP, THREE, TWO),
+  parse(r"λ (λ 0) 0"),
+  parse(r"λ 1 0"),
+  parse(r"λ λ 2 0"),
+  parse(r"λ 0 (λ 1 0)"),
+  parse(r"λ λ 1 (λ 1 0)"),
+  parse(r"0 (λ λ 2 3 1 0)"),
+  parse(r"0 (λ 1 0) ((λ 0) 2)"),
+  apply(K, Var(0), OMEGA),
+]
+
+def test_matches_step_loop():
+  for expr in TERMS:
+    result = normalize(expr)
+    assert result.normal, str(expr)
+    assert result.expr == step_normal_form(expr), str(expr)
+    assert result.steps == _count_steps(expr), str(expr)
+  ##
+##
+
+def test_eta_contractions_match_step_loop():
+  # (λ λ^n 0 n-1 ... 0) I — one β step exposes n nested η-redexes
+  n = 50
+  body = Var(n)
+  for index in range(n - 1, -1, -1):
+    body = Appl(body, Var(index))
+  ##
+  for _ in range(n):
+    body = Func(body)
+  ##
+  expr = Appl(Func(body), Func(Var(0)))
+  result = normalize(expr)
+  assert result.expr == step_normal_form(expr) == Func(Var(0))
+  assert result.steps == _count_steps(expr) == n + 1
+  partial = expr
+  for _ in range(10):
+    partial = step(partial)
+  ##
+  assert normalize(expr, max_steps=10).expr == partial
+##
+
+def test_normal_form_takes_no_steps():
+  result = normalize(parse(r"λ 0 (λ 0 1)"))
+  assert result.normal
+  assert result.steps == 0
+  assert result.expr == parse(r"λ 0 (λ 0 1)")
+##
+
+def test_max_steps_matches_partial_step_loop():
+  for expr in TERMS:
+    partial = expr
+    limit = 0
+    while (following := step(partial)) is not None:
+      result = normalize(expr, max_steps=limit)
+      assert not result.normal, str(expr)
+      assert result.steps == limit, str(expr)
+      assert result.expr == partial, str(expr)
+      partial = following
+      limit += 1
+    ##
+  ##
+##
+
+def test_omega_stops_at_max_steps():
+  result = normalize(OMEGA, max_steps=100)
+  assert not result.normal
+  assert result.steps == 100
+  assert result.expr == OMEGA
+  assert result.limit is Limit.STEPS
+##
+
+def test_normal_result_has_no_limit():
+  assert normalize(apply(TWO, Var(0), Var(1)), max_steps=2).limit is None
+##
+
+def test_size_budget():
+  # each step of (λ 0 0 0) (λ 0 0 0) grows the term
+  expr = parse(r"(λ 0 0 0) (λ 0 0 0)")
+  result = normalize(expr, max_size=100)
+  assert result.limit is Limit.SIZE
+  assert not result.normal
+  assert result.expr.size > 100
+  previous = normalize(expr, max_steps=result.steps - 1)
+  assert previous.expr.size <= 100
+  assert normalize(expr, max_steps=result.steps).expr == result.expr
+##
+
+def test_size_budget_for_strict_strategies():
+  expr = parse(r"(λ 0 0 0) (λ 0 0 0)")
+  for strategy in Strategy:
+    result = normalize(expr, max_size=50, strategy=strategy)
+    assert result.limit is Limit.SIZE, strategy
+    assert result.expr.size > 50, strategy
+  ##
+##
+
+def test_time_budget():
+  result = normalize(OMEGA, timeout=0.01)
+  assert result.limit is Limit.TIME
+  assert result.expr == OMEGA
+  assert result.steps > 0
+##
+
+def test_lazy_argument_is_discarded():
+  # K 0 Ω — normal order never touches Ω
+  result = normalize(apply(K, Var(0), OMEGA))
+  assert result.normal
+  assert result.expr == Var(0)
+##
+
+def test_deep_term():
+  # 20000 f x for a free f and x
+  body = Var(0)
+  for _ in range(20_000):
+    body = Appl(Var(1), body)
+  ##
+  numeral = Func(Func(body))
+  result = normalize(Appl(Appl(numeral, Var(0)), Var(1)))
+  assert result.normal
+  assert result.steps == 2
+  assert result.expr.size == 40_001
+  assert normalize(Func(Appl(numeral, Var(0)))).expr is numeral
+##
+
+def test_stepper_yields_each_step():
+  for expr in TERMS:
+    expected = []
+    current = expr
+    while (result := step(current)) is not None:
+      expected.append(current := result)
+    ##
+    stepper = Stepper(expr)
+    assert [snapshot.expr for snapshot in stepper] == expected, str(expr)
+    assert stepper.done
+    assert stepper.steps == len(expected)
+    assert stepper.expr == (expected[-1] if expected else expr)
+  ##
+##
+
+def test_stepper_is_lazy():
+  stepper = Stepper(OMEGA)
+  assert next(stepper).expr == OMEGA
+  assert next(stepper).expr == OMEGA
+  assert not stepper.done
+  assert stepper.steps == 2
+##
+
+def test_stepper_cost_follows_the_redex():
+  # each step rebuilds only the frames it touched, not the whole spine
+  expr: Expr = Var(0)
+  for _ in range(20_000):
+    expr = Appl(expr, Appl(I, Var(1)))
+  ##
+  stepper = Stepper(expr)
+  last = None
+  for last in stepper:
+    pass
+  ##
+  assert stepper.steps == 20_000
+  assert last is not None and last.expr == stepper.expr
+##
+
+def _subterm(expr: Expr, path: tuple[int, ...]) -> Expr:
+  for side in path:
+    if isinstance(expr, Func): expr = expr.body
+    elif side: expr = expr.arg
+    else: expr = expr.func
+  ##
+  return expr
+##
+
+def test_trace_matches_step_loop():
+  for term in TERMS:
+    expr = term
+    records = list(trace(expr, every=1))
+    for number, record in enumerate(records, 1):
+      redex = _subterm(expr, record.path)
+      if record.rule is Rule.BETA:
+        assert isinstance(redex, Appl) and isinstance(redex.func, Func), str(term)
+        assert expr.beta_step() == record.expr, str(term)
+      else:
+        assert expr.beta_step() is None, str(term)
+        assert isinstance(redex, Func) and redex.eta_step() is not None, str(term)
+        assert expr.eta_step() == record.expr, str(term)
+      ##
+      assert record.step == number
+      assert record.size_delta == record.expr.size - expr.size, str(term)
+      expr = record.expr
+    ##
+    assert step(expr) is None, str(term)
+  ##
+##
+
+def test_trace_yields_terms_every_n_steps():
+  records = list(trace(apply(EXP, TWO, THREE), every=3))
+  assert len(records) > 3
+  for record in records:
+    assert (record.expr is not None) == (record.step % 3 == 0)
+  ##
+  assert all(record.expr is None for record in trace(apply(MUL, TWO, THREE)))
+##
+
+def test_trace_on_a_long_spine():
+  # sizes come from each contraction rather than from re-measuring the term
+  expr: Expr = Var(0)
+  for _ in range(5000):
+    expr = Appl(expr, Appl(I, Var(1)))
+  ##
+  records = list(trace(expr))
+  assert len(records) == 5000
+  assert all(record.size_delta == -3 for record in records)
+  assert records[-1].path == (1,)
+##
+
+def _contract(expr: Appl) -> Expr:
+  assert isinstance(expr.func, Func)
+  return Appl(expr.func, expr.arg).beta_step()
+##
+
+def _step(expr: Expr, strategy: Strategy) -> Expr | None:
+  # straightforward recursive definitions of each strategy
+  weak = strategy in (Strategy.CALL_BY_VALUE, Strategy.CALL_BY_NAME, Strategy.WEAK_HEAD)
+  strict = strategy in (Strategy.APPLICATIVE, Strategy.CALL_BY_VALUE)
+  args = strategy not in (Strategy.HEAD, Strategy.WEAK_HEAD)
+  if isinstance(expr, Func):
+    if weak: return None
+    body = _step(expr.body, strategy)
+    return None if body is None else Func(body)
+  ##
+  if isinstance(expr, Var): return None
+  if not strict and isinstance(expr.func, Func): return _contract(expr)
+  func = _step(expr.func, strategy)
+  if func is not None: return Appl(func, expr.arg)
+  if args:
+    arg = _step(expr.arg, strategy)
+    if arg is not None: return Appl(expr.func, arg)
+  ##
+  if isinstance(expr.func, Func): return _contract(expr)
+  return None
+##
+
+def _strategy_sequence(expr: Expr, strategy: Strategy, limit: int) -> list[Expr]:
+  terms = []
+  while len(terms) < limit and (result := _step(expr, strategy)) is not None:
+    terms.append(expr := result)
+  ##
+  if strategy in (Strategy.NORMAL, Strategy.APPLICATIVE):
+    while len(terms) < limit and (result := expr.eta_step()) is not None:
+      terms.append(expr := result)
+    ##
+  ##
+  return terms
+##
+
+def test_strategies_match_reference():
+  for strategy in Strategy:
+    for expr in TERMS:
+      expected = _strategy_sequence(expr, strategy, 200)
+      stepper = Stepper(expr, strategy)
+      # snapshots stay valid after the stepper has moved on
+      snapshots = [snapshot for snapshot, _ in zip(stepper, range(200))]
+      assert [snapshot.expr for snapshot in snapshots] == expected, (strategy, str(expr))
+      result = normalize(expr, max_steps=200, strategy=strategy)
+      assert result.steps == len(expected), (strategy, str(expr))
+      assert result.expr == (expected[-1] if expected else expr), (strategy, str(expr))
+      assert result.normal == (len(expected) < 200), (strategy, str(expr))
+    ##
+  ##
+##
+
+def test_strategy_normal_forms():
+  assert normalize(apply(K, Var(0), OMEGA), strategy=Strategy.CALL_BY_NAME).expr == Var(0)
+  assert not normalize(apply(K, Var(0), OMEGA), max_steps=50, strategy=Strategy.APPLICATIVE).normal
+  assert normalize(Func(Appl(I, Var(0))), strategy=Strategy.WEAK_HEAD).steps == 0
+  assert normalize(Func(Appl(I, Var(0))), strategy=Strategy.HEAD).expr == I
+  assert normalize(Appl(Var(0), Appl(I, Var(1))), strategy=Strategy.HEAD).steps == 0
+  assert normalize(Appl(Var(0), Appl(I, Var(1))), strategy=Strategy.CALL_BY_NAME).expr == parse(r"0 1")
+  assert normalize(apply(K, Var(0), Appl(I, Var(1))), strategy=Strategy.CALL_BY_VALUE).steps == 3
+  assert normalize(apply(K, Var(0), Appl(I, Var(1))), strategy=Strategy.CALL_BY_NAME).steps == 2
+##
+
+def test_applicative_order_shares_work():
+  expr = Appl(TWO, apply(MUL, TWO, THREE))
+  normal = normalize(expr)
+  applicative = normalize(expr, strategy=Strategy.APPLICATIVE)
+  assert normal.expr == applicative.expr
+  assert applicative.steps < normal.steps
+##
+
+def test_cycle_detection():
+  result = normalize(OMEGA, cycle_window=16)
+  assert result.limit is Limit.CYCLE
+  assert result.period == 1
+  assert result.expr == OMEGA
+  # the cycle sits below a lambda and an application spine
+  result = normalize(parse(r"λ 1 ((λ 0 0) (λ 0 0))"), cycle_window=16)
+  assert result.limit is Limit.CYCLE
+  assert result.period == 1
+  result = normalize(parse(r"(λ λ 0 1 0) 2 (λ λ 0 1 0)"), cycle_window=16)
+  assert result.limit is Limit.CYCLE
+  assert result.period == 2
+  assert result.steps == 2
+##
+
+def test_cycle_detection_leaves_other_results_alone():
+  for expr in TERMS:
+    assert normalize(expr, cycle_window=4) == normalize(expr), str(expr)
+  ##
+  # a growing term never repeats
+  result = normalize(parse(r"(λ 0 0 1) (λ 0 0 1)"), max_steps=100, cycle_window=16)
+  assert result.limit is Limit.STEPS
+  assert result.period is None
+##
+
+def test_cached_normal_forms_match():
+  cache = NormalFormCache()
+  for strategy in (Strategy.NORMAL, Strategy.APPLICATIVE):
+    for expr in TERMS[:-1] if strategy is Strategy.APPLICATIVE else TERMS:
+      for _ in range(2):
+        result = normalize(expr, cache=cache, strategy=strategy)
+        assert result.normal, str(expr)
+        assert result.expr == normalize(expr).expr, str(expr)
+      ##
+    ##
+  ##
+  assert cache.hits > 0
+  assert cache.misses > 0
+##
+
+def test_cache_reuses_repeated_subterms():
+  cache = NormalFormCache()
+  expr = apply(Var(0), apply(MUL, TWO, THREE), apply(MUL, TWO, THREE))
+  first = normalize(expr, cache=cache)
+  assert first.expr == normalize(expr).expr
+  assert first.steps < normalize(expr).steps
+  assert cache.hits == 1
+  second = normalize(expr, cache=cache)
+  assert second.expr == first.expr
+  assert second.steps == 0
+  assert cache.hits == 2
+##
+
+def test_cache_is_bounded_by_nodes():
+  cache = NormalFormCache(max_nodes=60)
+  for expr in TERMS:
+    normalize(expr, cache=cache)
+    assert cache.nodes <= 60
+  ##
+  assert cache.evictions > 0
+  assert cache.nodes == sum(key.size + value.size for key, value in cache._entries.items())
+##
+
+def test_cache_with_partial_reduction():
+  cache = NormalFormCache()
+  expr = apply(EXP, TWO, THREE)
+  nf = normalize(expr).expr
+  result = normalize(expr, max_steps=5, cache=cache)
+  assert not result.normal
+  assert normalize(result.expr).expr == nf
+  assert normalize(expr, cache=cache).expr == nf
+##
+
+def test_cache_respects_max_size():
+  # the cached normal form is larger than the budget the uncached run stops at
+  expr = Appl(Var(5), apply(EXP, THREE, THREE))
+  cache = NormalFormCache()
+  nf = normalize(expr, cache=cache).expr
+  assert normalize(expr, max_size=40).limit is Limit.SIZE
+  result = normalize(expr, cache=cache, max_size=40)
+  assert result.limit is Limit.SIZE
+  assert result.expr.size > 40
+  assert not result.normal
+  result = normalize(Appl(expr, Appl(I, Var(0))), cache=cache, max_size=nf.size + 5)
+  assert result.normal
+  assert result.expr == Appl(nf, Var(0))
+##
+
+def test_cache_rejects_weak_strategies():
+  with pytest.raises(ValueError):
+    normalize(I, strategy=Strategy.CALL_BY_NAME, cache=NormalFormCache())
+  ##
+##
@@ -0,0 +1,49 @@
+from mockingbird.church import MUL, numeral
+from mockingbird.parser import parse
+from mockingbird.ski import Ap, Comb, normalize, to_combinators, to_expr
+from tests.engines import K, S, TERMS, assert_matches_step_loop, assert_normalizes_deep_numeral, assert_shares_arguments, step_normal_form
+
+def test_normalize_matches_step_loop():
+  # λ (λ 1) Ω compiles to C K Ω, whose Ω must never be reduced
+  assert_matches_step_loop(normalize)
+##
+
+def test_bird_combinators_compile_to_themselves():
+  assert to_combinators(S) == Comb.S
+  assert to_combinators(K) == Comb.K
+  assert to_combinators(parse(r"λ 0")) == Comb.I
+  assert to_combinators(MUL) == Comb.B
+  assert to_combinators(parse(r"λ λ λ 2 0 1")) == Comb.C
+##
+
+def test_turner_optimizations():
+  assert to_combinators(parse(r"λ 1 0")) == -1
+  assert to_combinators(parse(r"λ 1 2")) == Ap(Comb.K, Ap(-1, -2))
+  assert to_combinators(parse(r"λ 1 (0 2)")) == Ap(Ap(Comb.B, -1), Ap(Ap(Comb.C, Comb.I), -2))
+  assert to_combinators(parse(r"λ 0 0")) == Ap(Ap(Comb.S, Comb.I), Comb.I)
+##
+
+def test_translation_back_is_equivalent():
+  for expr in TERMS:
+    assert step_normal_form(to_expr(to_combinators(expr))) == step_normal_form(expr), str(expr)
+  ##
+##
+
+def test_shared_arguments_are_reduced_once():
+  assert_shares_arguments(normalize)
+##
+
+def test_deep_numeral():
+  assert_normalizes_deep_numeral(normalize)
+##
+
+def test_deep_terms_compare_hash_and_print():
+  term = to_combinators(numeral(3000))
+  other = to_combinators(numeral(3000))
+  assert term is not other
+  assert term == other
+  assert hash(term) == hash(other)
+  assert term != to_combinators(numeral(2999))
+  assert repr(term).startswith("Ap(func=")
+  assert repr(Ap(Comb.K, -1)) == "Ap(func=<Comb.K: 'K'>, arg=-1)"
+##
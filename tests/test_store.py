@@ -0,0 +1,124 @@
+import pickle
+import pytest
+from mockingbird.ast import Appl, Func, Var, step
+from mockingbird.parser import parse
+from mockingbird.store import Store
+
+TERMS = [
+  "0",
+  "λ 0",
+  "λ (λ 1 (0 0)) (λ 1 (0 0))",
+  "(λ λ λ 2 0 (1 0)) (λ λ 1) (λ λ 1)",
+  "(λ λ 1 (1 0)) 0 1",
+  "λ λ 1 (λ 1 0)",
+  "0 (λ 1 0) ((λ 0) 2)",
+  "λ 2 (λ 3 0 1) 4",
+]
+
+def test_round_trip():
+  store = Store()
+  for text in TERMS:
+    expr = parse(text)
+    assert store.expr(store.add(expr)) is expr
+  ##
+##
+
+def test_shared_subterms_are_stored_once():
+  # 14 tree nodes, 7 distinct ones
+  store = Store()
+  store.add(parse("λ (λ 1 (0 0)) (λ 1 (0 0))"))
+  assert len(store) == 7
+##
+
+def test_shift_and_substitute_match_ast():
+  store = Store()
+  for text in TERMS:
+    expr = parse(text)
+    node = store.add(expr)
+    assert store.expr(store.shift(node, 2)) == expr.shift(2)
+    assert store.expr(store.shift(node, 1, cutoff=1)) == expr.shift(1, cutoff=1)
+    assert store.expr(store.substitute(node, 0, store.add(Var(7)))) == expr.substitute(0, Var(7))
+    assert store.expr(store.substitute(node, 1, store.add(Func(Var(3))))) == expr.substitute(1, Func(Var(3)))
+  ##
+##
+
+def test_beta_reduce_matches_ast():
+  store = Store()
+  body, arg = parse("λ 1 (λ 2 0 3)"), parse("0 (λ 1)")
+  result = store.beta_reduce(store.add(body), store.add(arg))
+  assert store.expr(result) == Appl(Func(body), arg).beta_step()
+##
+
+def test_steps_match_ast():
+  store = Store()
+  for text in TERMS[3:]:
+    expr = parse(text)
+    node = store.add(expr)
+    while True:
+      expected = step(expr)
+      result = store.step(node)
+      if expected is None:
+        assert result is None
+        break
+      ##
+      assert result is not None
+      assert store.expr(result) == expected
+      expr, node = expected, result
+    ##
+  ##
+##
+
+def test_extract_keeps_only_reachable_nodes():
+  store = Store()
+  node = store.add(parse("(λ λ 1 (1 0)) 0 1"))
+  while (result := store.step(node)) is not None:
+    node = result
+  ##
+  compact, roots = store.extract([node])
+  assert len(compact) < len(store)
+  assert compact.expr(roots[0]) == parse("0 (0 1)")
+##
+
+def test_bytes_and_pickle():
+  store = Store()
+  roots = [store.add(parse(text)) for text in TERMS]
+  for copy in (Store.frombytes(store.tobytes()), pickle.loads(pickle.dumps(store))):
+    assert [copy.expr(root) for root in roots] == [parse(text) for text in TERMS]
+  ##
+  with pytest.raises(ValueError):
+    Store.frombytes(store.tobytes()[:-1])
+  ##
+  with pytest.raises(ValueError):
+    Store.frombytes(b"XXXX" + store.tobytes()[4:])
+  ##
+  with pytest.raises(ValueError):
+    Store.frombytes(b"MBST")
+  ##
+##
+
+def test_bytes_with_wider_indices():
+  # a store written where the index arrays hold 8-byte integers
+  store = Store()
+  roots = [store.add(parse(text)) for text in TERMS]
+  arrays = [b"".join(n.to_bytes(8, "little", signed=True) for n in a) for a in (store.left, store.right, store.max_free)]
+  data = b"".join([b"MBST", bytes([8]), len(store).to_bytes(8, "little"), store.tags.tobytes(), *arrays])
+  copy = Store.frombytes(data)
+  assert [copy.expr(root) for root in roots] == [parse(text) for text in TERMS]
+  with pytest.raises(ValueError):
+    Store.frombytes(b"MBST" + bytes([3]) + data[5:])
+  ##
+##
+
+def test_deep_term():
+  body = Var(0)
+  for _ in range(20_000):
+    body = Appl(Var(1), body)
+  ##
+  numeral = Func(Func(body))
+  store = Store()
+  node = store.add(Appl(Appl(numeral, Var(0)), Var(1)))
+  while (result := store.step(node)) is not None:
+    node = result
+  ##
+  assert store.expr(node).size == 40_001
+##